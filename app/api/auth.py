@@ -1,20 +1,94 @@
-from typing import Optional
+from typing import Optional, Dict, Tuple
+import hashlib
+import hmac
+import os
+import time
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from ..models.auth import (
     LoginRequest, LoginResponse, RegisterRequest, 
-    PasswordChangeRequest, User
+    PasswordChangeRequest, User, UserSession
 )
 from ..auth.service import AuthenticationService
+from ..auth.session_store import SessionStore
+from ..auth.user_repository import UserRepository
 from ..logging.audit import audit_log
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 security = HTTPBearer()
 
-# Global auth service instance (in production, use dependency injection)
-auth_service = AuthenticationService()
+# Global auth service instance (in production, use dependency injection).
+# Setting REDIS_URL shares sessions between worker processes, and
+# USERS_DB_PATH keeps user accounts in a SQLite database.
+REDIS_URL = os.getenv("REDIS_URL")
+USERS_DB_PATH = os.getenv("USERS_DB_PATH")
+auth_service = AuthenticationService(
+    session_store=SessionStore(REDIS_URL) if REDIS_URL else None,
+    user_repository=UserRepository(USERS_DB_PATH) if USERS_DB_PATH else None
+)
+
+# Short-lived cache of validated sessions keyed by SHA-256 of the bearer token.
+# Only used without a shared session store: it is per process, so with one it
+# would keep accepting tokens that another worker has logged out.
+_SESSION_TTL = 60  # seconds
+_session_cache: Dict[bytes, Tuple[Tuple[User, UserSession], float]] = {}
+
+
+def _token_key(token: str) -> bytes:
+    """Hash a bearer token for use as a session cache key"""
+    return hashlib.sha256(token.encode()).digest()
+
+
+async def _cached_validate(token: str) -> Optional[Tuple[User, UserSession]]:
+    """Validate a session token, reusing recent results for up to _SESSION_TTL seconds"""
+    if auth_service.session_store is not None:
+        return await auth_service.validate_session(token)
+    
+    key = _token_key(token)
+    now = time.monotonic()
+    
+    cached = _session_cache.get(key)
+    if cached:
+        user_session, expires = cached
+        _, session = user_session
+        if now < expires and session.is_active and not session.is_expired():
+            return user_session
+        _session_cache.pop(key, None)
+    
+    user_session = await auth_service.validate_session(token)
+    if user_session:
+        _session_cache[key] = (user_session, now + _SESSION_TTL)
+    return user_session
+
+
+def _invalidate_cached_session(token: str) -> None:
+    """Drop a token from the session cache"""
+    _session_cache.pop(_token_key(token), None)
+
+
+def _invalidate_cached_user(user_id: str) -> None:
+    """Drop every cached session belonging to a user"""
+    for key, ((user, _), _) in list(_session_cache.items()):
+        if user.user_id == user_id:
+            _session_cache.pop(key, None)
+
+
+def _invalid_token() -> HTTPException:
+    """401 raised for missing, invalid or expired session tokens"""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired token"
+    )
+
+
+def _invalid_credentials() -> HTTPException:
+    """401 raised for failed logins (deliberately doesn't say which field was wrong)"""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid email or password"
+    )
 
 
 def get_client_ip(request: Request) -> str:
@@ -58,10 +132,7 @@ async def login(
                     "user_agent": user_agent
                 }
             )
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password"
-            )
+            raise _invalid_credentials()
         
         # Log successful login
         background_tasks.add_task(
@@ -94,12 +165,9 @@ async def logout(
     """Patient logout endpoint"""
     try:
         # Validate current session
-        user_session = await auth_service.validate_session(credentials.credentials)
+        user_session = await _cached_validate(credentials.credentials)
         if not user_session:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
+            raise _invalid_token()
         
         user, session = user_session
         
@@ -115,6 +183,8 @@ async def logout(
                 detail="Logout failed"
             )
         
+        _invalidate_cached_session(credentials.credentials)
+        
         # Log logout
         background_tasks.add_task(
             audit_log,
@@ -142,17 +212,15 @@ async def logout_all_sessions(
     """Logout from all sessions"""
     try:
         # Validate current session
-        user_session = await auth_service.validate_session(credentials.credentials)
+        user_session = await _cached_validate(credentials.credentials)
         if not user_session:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
+            raise _invalid_token()
         
         user, _ = user_session
         
         # Logout from all sessions
         sessions_count = await auth_service.logout_all_sessions(user.user_id)
+        _invalidate_cached_user(user.user_id)
         
         # Log logout all
         background_tasks.add_task(
@@ -228,12 +296,9 @@ async def get_current_user(
     """Get current user profile"""
     try:
         # Validate session
-        user_session = await auth_service.validate_session(credentials.credentials)
+        user_session = await _cached_validate(credentials.credentials)
         if not user_session:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
+            raise _invalid_token()
         
         user, session = user_session
         
@@ -270,12 +335,9 @@ async def update_profile(
     """Update user profile"""
     try:
         # Validate session
-        user_session = await auth_service.validate_session(credentials.credentials)
+        user_session = await _cached_validate(credentials.credentials)
         if not user_session:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
+            raise _invalid_token()
         
         user, _ = user_session
         
@@ -318,20 +380,20 @@ async def change_password(
 ):
     """Change user password"""
     try:
-        # Validate password confirmation
-        if password_change.new_password != password_change.confirm_password:
+        # Validate password confirmation (before touching the session store)
+        if not hmac.compare_digest(
+            password_change.new_password.encode(),
+            password_change.confirm_password.encode()
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="New passwords don't match"
             )
         
         # Validate session
-        user_session = await auth_service.validate_session(credentials.credentials)
+        user_session = await _cached_validate(credentials.credentials)
         if not user_session:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
+            raise _invalid_token()
         
         user, _ = user_session
         
@@ -372,12 +434,9 @@ async def validate_token(
 ):
     """Validate if token is still valid"""
     try:
-        user_session = await auth_service.validate_session(credentials.credentials)
+        user_session = await _cached_validate(credentials.credentials)
         if not user_session:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
+            raise _invalid_token()
         
         user, session = user_session
         
@@ -2,15 +2,27 @@
 Batch processing API endpoints for bulk operations.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks, Query, Request
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import json
+import orjson
 import uuid
 from datetime import datetime
 from pathlib import Path
 import asyncio
+import contextlib
+import functools
 import os
+import secrets
+import tempfile
+
+import aiofiles
+
+from ..logging import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api/batch", tags=["batch-operations"])
 
@@ -18,120 +30,284 @@ router = APIRouter(prefix="/api/batch", tags=["batch-operations"])
 BATCH_DATA_PATH = Path(__file__).parent.parent.parent / "scripts" / "seed_data"
 SAMPLE_DATA_PATH = BATCH_DATA_PATH / "sample_data.json"
 
-# Batch job status tracking
-_batch_jobs = {}
+# Kaggle healthcare dataset columns consumed by transform_kaggle_patient_data
+KAGGLE_COLUMNS = (
+    "Name", "Age", "Gender", "Blood Type", "Medical Condition", "Doctor",
+    "Hospital", "Insurance Provider", "Medication", "Admission Type",
+    "Test Results", "Billing Amount", "Room Number", "Discharge Date"
+)
+KAGGLE_DTYPES = {"Age": "Int64", "Room Number": "Int64", "Billing Amount": "float64"}
+
+# Uploads are spooled to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Largest accepted upload, in bytes
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+
+# Maximum number of care plans generated concurrently
+CAREPLAN_CONCURRENCY = int(os.getenv("CAREPLAN_CONCURRENCY", "32"))
+_careplan_semaphore = asyncio.Semaphore(CAREPLAN_CONCURRENCY)
+
+# Dedicated pool for pandas parsing so it can't starve the default executor
+_parse_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="batch-parse")
+
+# Parsed sample data keyed by the file's (mtime_ns, size)
+_sample_data_cache: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None
+
+# Batch job status tracking (bounded; finished jobs are evicted after a grace period)
+_batch_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_MAX_JOBS = 1024
+_JOB_RETENTION_SECONDS = 3600
+_TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+_jobs_lock = asyncio.Lock()
+
+
+async def _put_job(job_id: str, job: Dict[str, Any]) -> None:
+    """Register a batch job, evicting the oldest jobs beyond _MAX_JOBS."""
+    job.setdefault("_event", asyncio.Event())
+    async with _jobs_lock:
+        _batch_jobs[job_id] = job
+        _batch_jobs.move_to_end(job_id)
+        while len(_batch_jobs) > _MAX_JOBS:
+            _batch_jobs.popitem(last=False)
+
+
+async def _update_job(job_id: str, error: Optional[str] = None, **fields: Any) -> None:
+    """Update a batch job's fields and schedule eviction once it reaches a terminal state."""
+    async with _jobs_lock:
+        job = _batch_jobs.get(job_id)
+        if job is None:
+            return
+        job.update(fields)
+        if error:
+            job["errors"].append(error)
+        
+        # Wake any long-polling status requests
+        job["_event"].set()
+        job["_event"].clear()
+    
+    if fields.get("status") in _TERMINAL_STATUSES:
+        asyncio.get_running_loop().call_later(
+            _JOB_RETENTION_SECONDS, _batch_jobs.pop, job_id, None
+        )
+
+
+def _public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a batch job to its client-facing fields (drops internal '_' keys)."""
+    return {k: v for k, v in job.items() if not k.startswith("_")}
+
+
+def _prime_sample_data_cache(data: Dict[str, Any]) -> None:
+    """Cache data just written to disk so the next read doesn't re-parse the file."""
+    global _sample_data_cache
+    try:
+        stat = SAMPLE_DATA_PATH.stat()
+    except OSError:
+        _sample_data_cache = None
+        return
+    _sample_data_cache = (
+        (stat.st_mtime_ns, stat.st_size),
+        {kind: list(value) if isinstance(value, list) else value for kind, value in data.items()}
+    )
+
+
+def _remove_upload(path: Optional[str]) -> None:
+    """Delete a spooled upload file if it still exists."""
+    if path:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+
+def _empty_sample_data() -> Dict[str, Any]:
+    return {"patients": [], "intakes": [], "ehr_records": [], "care_plans": []}
+
+def _read_sample_data() -> Dict[str, Any]:
+    """Return the parsed sample data, re-reading the file only when it changes. Treat as read-only."""
+    global _sample_data_cache
+    try:
+        stat = SAMPLE_DATA_PATH.stat()
+    except FileNotFoundError:
+        return _empty_sample_data()
+    
+    key = (stat.st_mtime_ns, stat.st_size)
+    if _sample_data_cache is not None and _sample_data_cache[0] == key:
+        return _sample_data_cache[1]
+    
+    data = orjson.loads(SAMPLE_DATA_PATH.read_bytes())
+    _sample_data_cache = (key, data)
+    return data
 
 def load_sample_data() -> Dict[str, Any]:
-    """Load existing sample data."""
+    """Load existing sample data (record lists are copied, records themselves are shared)."""
     try:
-        if SAMPLE_DATA_PATH.exists():
-            with open(SAMPLE_DATA_PATH, 'r') as f:
-                return json.load(f)
-        else:
-            return {"patients": [], "intakes": [], "ehr_records": [], "care_plans": []}
+        return {
+            kind: list(value) if isinstance(value, list) else value
+            for kind, value in _read_sample_data().items()
+        }
     except Exception as e:
-        print(f"Error loading sample data: {e}")
-        return {"patients": [], "intakes": [], "ehr_records": [], "care_plans": []}
+        logger.exception("Error loading sample data", error=str(e))
+        return _empty_sample_data()
 
 def save_sample_data(data: Dict[str, Any]) -> bool:
-    """Save sample data to file."""
+    """Save sample data to file, replacing it atomically."""
     try:
         BATCH_DATA_PATH.mkdir(parents=True, exist_ok=True)
-        with open(SAMPLE_DATA_PATH, 'w') as f:
-            json.dump(data, f, indent=2)
+        tmp_path = SAMPLE_DATA_PATH.with_suffix(".json.tmp")
+        tmp_path.write_bytes(orjson.dumps(data))
+        os.replace(tmp_path, SAMPLE_DATA_PATH)
+        _prime_sample_data_cache(data)
         return True
     except Exception as e:
-        print(f"Error saving sample data: {e}")
+        logger.exception("Error saving sample data", error=str(e))
         return False
 
-def transform_kaggle_patient_data(df: pd.DataFrame) -> List[Dict[str, Any]]:
+def append_records(records: Dict[str, List[Dict[str, Any]]], truncate: bool = False) -> bool:
+    """
+    Append records to the sample data file in a single write.
+    
+    Args:
+        records: New records keyed by kind ("patients", "intakes", "ehr_records", "care_plans")
+        truncate: Replace the existing records of each given kind instead of appending
+    """
+    data = load_sample_data()
+    for kind, new_records in records.items():
+        if truncate:
+            data[kind] = list(new_records)
+        else:
+            data.setdefault(kind, []).extend(new_records)
+    return save_sample_data(data)
+
+def read_upload_dataframe(upload_path: str, filename: str) -> pd.DataFrame:
+    """Read an uploaded CSV or Excel file, parsing only the columns we consume."""
+    if filename.endswith('.csv'):
+        return pd.read_csv(
+            upload_path,
+            engine='c',
+            memory_map=True,
+            dtype=KAGGLE_DTYPES,
+            usecols=lambda column: column in KAGGLE_COLUMNS
+        )
+    return pd.read_excel(
+        upload_path,
+        usecols=lambda column: column in KAGGLE_COLUMNS
+    )
+
+
+def transform_kaggle_patient_data(
+    df: pd.DataFrame
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
     """Transform Kaggle healthcare dataset to our patient format."""
-    patients = []
-    intakes = []
-    ehr_records = []
+    n = len(df)
+    df = df.reindex(columns=KAGGLE_COLUMNS)
     
-    for _, row in df.iterrows():
-        patient_id = str(uuid.uuid4())
-        
-        # Transform patient data
-        patient = {
+    # Column-wise extraction with defaults applied once per column
+    names = df["Name"].fillna("").to_numpy()
+    ages = pd.to_numeric(df["Age"], errors="coerce").fillna(30).astype(int).to_numpy()
+    genders = df["Gender"].fillna("Unknown").to_numpy()
+    blood_types = df["Blood Type"].fillna("O+").to_numpy()
+    conditions = df["Medical Condition"].fillna("General Health").to_numpy()
+    symptoms = df["Medical Condition"].fillna("General symptoms").to_numpy()
+    doctors = df["Doctor"].fillna("Dr. Smith").to_numpy()
+    hospitals = df["Hospital"].fillna("General Hospital").to_numpy()
+    insurers = df["Insurance Provider"].fillna("Health Insurance Co.").to_numpy()
+    medications = df["Medication"].to_numpy()
+    admission_types = df["Admission Type"].fillna("Emergency").to_numpy()
+    test_results = df["Test Results"].fillna("Normal").to_numpy()
+    billing = pd.to_numeric(df["Billing Amount"], errors="coerce").fillna(0.0).astype(float).to_numpy()
+    rooms = pd.to_numeric(df["Room Number"], errors="coerce").fillna(101).astype(int).to_numpy()
+    now = datetime.now()
+    discharge_dates = df["Discharge Date"].fillna(now.strftime('%Y-%m-%d')).to_numpy()
+    now_iso = now.isoformat()
+    
+    patient_ids = [uuid.uuid4().hex for _ in range(n)]
+    
+    patients = [
+        {
             "patient_id": patient_id,
-            "name": row.get('Name', f"Patient {len(patients) + 1}"),
-            "age": int(row.get('Age', 0)) if pd.notna(row.get('Age')) else 30,
-            "gender": row.get('Gender', 'Unknown'),
-            "blood_type": row.get('Blood Type', 'O+'),
-            "medical_condition": row.get('Medical Condition', 'General Health'),
-            "doctor": row.get('Doctor', 'Dr. Smith'),
-            "hospital": row.get('Hospital', 'General Hospital'),
-            "insurance_provider": row.get('Insurance Provider', 'Health Insurance Co.')
+            "name": name or f"Patient {i + 1}",
+            "age": int(age),
+            "gender": gender,
+            "blood_type": blood_type,
+            "medical_condition": condition,
+            "doctor": doctor,
+            "hospital": hospital,
+            "insurance_provider": insurer
         }
-        patients.append(patient)
-        
-        # Create intake record
-        intake = {
-            "intake_id": str(uuid.uuid4()),
+        for i, (patient_id, name, age, gender, blood_type, condition, doctor, hospital, insurer)
+        in enumerate(zip(patient_ids, names, ages, genders, blood_types,
+                         conditions, doctors, hospitals, insurers))
+    ]
+    
+    intakes = [
+        {
+            "intake_id": uuid.uuid4().hex,
             "patient_id": patient_id,
-            "chief_complaint": patient["medical_condition"],
-            "symptoms": [row.get('Medical Condition', 'General symptoms')],
-            "medical_history": f"Patient with {patient['medical_condition']}",
-            "current_medications": row.get('Medication', '').split(',') if pd.notna(row.get('Medication')) else [],
+            "chief_complaint": condition,
+            "symptoms": [symptom],
+            "medical_history": f"Patient with {condition}",
+            "current_medications": medication.split(',') if pd.notna(medication) else [],
             "allergies": [],
             "lifestyle_factors": {
                 "smoking": False,
                 "alcohol": False,
                 "exercise": "moderate"
             },
-            "created_date": datetime.now().isoformat(),
+            "created_date": now_iso,
             "status": "completed"
         }
-        intakes.append(intake)
-        
-        # Create EHR record
-        ehr = {
-            "ehr_id": str(uuid.uuid4()),
+        for patient_id, condition, symptom, medication
+        in zip(patient_ids, conditions, symptoms, medications)
+    ]
+    
+    ehr_records = [
+        {
+            "ehr_id": uuid.uuid4().hex,
             "patient_id": patient_id,
-            "admission_type": row.get('Admission Type', 'Emergency'),
-            "test_results": row.get('Test Results', 'Normal'),
-            "billing_amount": float(row.get('Billing Amount', 0)) if pd.notna(row.get('Billing Amount')) else 0.0,
-            "room_number": int(row.get('Room Number', 101)) if pd.notna(row.get('Room Number')) else 101,
-            "discharge_date": row.get('Discharge Date', datetime.now().strftime('%Y-%m-%d')),
-            "created_date": datetime.now().isoformat()
+            "admission_type": admission_type,
+            "test_results": test_result,
+            "billing_amount": float(amount),
+            "room_number": int(room),
+            "discharge_date": discharge_date,
+            "created_date": now_iso
         }
-        ehr_records.append(ehr)
+        for patient_id, admission_type, test_result, amount, room, discharge_date
+        in zip(patient_ids, admission_types, test_results, billing, rooms, discharge_dates)
+    ]
     
     return patients, intakes, ehr_records
 
 async def generate_care_plan_for_patient(patient: Dict[str, Any], intake: Dict[str, Any]) -> Dict[str, Any]:
     """Generate an LLM-assisted care plan for a patient."""
-    # Simulate LLM generation with realistic care plan data
-    await asyncio.sleep(0.1)  # Simulate processing time
+    name = patient["name"]
+    condition = patient["medical_condition"]
+    now = datetime.now().isoformat()
     
     care_plan = {
-        "careplan_id": str(uuid.uuid4()),
+        "careplan_id": uuid.uuid4().hex,
         "patient_id": patient["patient_id"],
-        "patient_name": patient["name"],
-        "primary_diagnosis": patient["medical_condition"],
-        "chief_complaint": intake.get("chief_complaint", patient["medical_condition"]),
-        "clinical_summary": f"Patient {patient['name']} presents with {patient['medical_condition']}. "
+        "patient_name": name,
+        "primary_diagnosis": condition,
+        "chief_complaint": intake.get("chief_complaint", condition),
+        "clinical_summary": f"Patient {name} presents with {condition}. "
                            f"Comprehensive care plan developed based on current symptoms and medical history.",
         "version": 1,
         "status": "under_review",  # AI-generated plans require clinician review before activation
         "confidence_score": 0.85,
         "llm_model_used": "gpt-4-healthcare",
-        "created_date": datetime.now().isoformat(),
-        "last_modified": datetime.now().isoformat(),
+        "created_date": now,
+        "last_modified": now,
         
         # Generate actions based on condition
-        "actions": generate_actions_for_condition(patient["medical_condition"]),
+        "actions": generate_actions_for_condition(condition),
         
         # Generate goals
         "short_term_goals": [
-            f"Stabilize {patient['medical_condition']} symptoms within 2 weeks",
+            f"Stabilize {condition} symptoms within 2 weeks",
             "Establish regular monitoring routine",
             "Patient education on condition management"
         ],
         "long_term_goals": [
-            f"Achieve optimal management of {patient['medical_condition']}",
+            f"Achieve optimal management of {condition}",
             "Prevent complications and improve quality of life",
             "Maintain treatment adherence"
         ],
@@ -141,80 +317,81 @@ async def generate_care_plan_for_patient(patient: Dict[str, Any], intake: Dict[s
             "No emergency visits related to condition"
         ],
         "educational_resources": [
-            f"Understanding {patient['medical_condition']}",
+            f"Understanding {condition}",
             "Medication adherence guide",
             "Lifestyle modifications handbook"
         ],
-        "patient_instructions": f"Follow prescribed treatment plan for {patient['medical_condition']}. "
+        "patient_instructions": f"Follow prescribed treatment plan for {condition}. "
                              "Monitor symptoms daily and report any changes to your healthcare provider."
     }
     
     return care_plan
 
-def generate_actions_for_condition(condition: str) -> List[Dict[str, Any]]:
-    """Generate appropriate actions based on medical condition."""
-    base_actions = [
+@functools.lru_cache(maxsize=256)
+def _action_templates(condition: str) -> Tuple[Dict[str, Any], ...]:
+    """Build the action templates for a condition, without per-action IDs."""
+    condition_lower = condition.lower()
+    templates = [
         {
-            "action_id": str(uuid.uuid4()),
             "description": f"Initial assessment and diagnosis confirmation for {condition}",
             "action_type": "diagnostic",
             "priority": "high",
             "timeline": "immediate",
             "rationale": "Establish baseline and confirm diagnosis",
-            "evidence_source": "Clinical guidelines",
-            "contraindications": []
+            "evidence_source": "Clinical guidelines"
         },
         {
-            "action_id": str(uuid.uuid4()),
             "description": f"Medication therapy for {condition}",
             "action_type": "medication",
             "priority": "high",
             "timeline": "ongoing",
             "rationale": "Control symptoms and prevent progression",
-            "evidence_source": "Standard treatment protocols",
-            "contraindications": []
+            "evidence_source": "Standard treatment protocols"
         },
         {
-            "action_id": str(uuid.uuid4()),
             "description": "Patient education and lifestyle counseling",
             "action_type": "lifestyle",
             "priority": "medium",
             "timeline": "within 1 week",
             "rationale": "Improve patient understanding and compliance",
-            "evidence_source": "Patient education best practices",
-            "contraindications": []
+            "evidence_source": "Patient education best practices"
         }
     ]
     
     # Add condition-specific actions
-    if "diabetes" in condition.lower():
-        base_actions.append({
-            "action_id": str(uuid.uuid4()),
+    if "diabetes" in condition_lower:
+        templates.append({
             "description": "Blood glucose monitoring setup",
             "action_type": "monitoring",
             "priority": "high",
             "timeline": "within 24 hours",
             "rationale": "Essential for diabetes management",
-            "evidence_source": "Diabetes care guidelines",
-            "contraindications": []
+            "evidence_source": "Diabetes care guidelines"
         })
     
-    if "hypertension" in condition.lower():
-        base_actions.append({
-            "action_id": str(uuid.uuid4()),
+    if "hypertension" in condition_lower:
+        templates.append({
             "description": "Blood pressure monitoring protocol",
             "action_type": "monitoring",
             "priority": "high",
             "timeline": "daily",
             "rationale": "Monitor treatment effectiveness",
-            "evidence_source": "Hypertension management guidelines",
-            "contraindications": []
+            "evidence_source": "Hypertension management guidelines"
         })
     
-    return base_actions
+    return tuple(templates)
+
+
+def generate_actions_for_condition(condition: str) -> List[Dict[str, Any]]:
+    """Generate appropriate actions based on medical condition."""
+    return [
+        {"action_id": uuid.uuid4().hex, **template, "contraindications": []}
+        for template in _action_templates(condition)
+    ]
 
 @router.post("/intake/upload")
 async def batch_intake_upload(
+    request: Request,
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...)
 ) -> Dict[str, Any]:
@@ -222,33 +399,51 @@ async def batch_intake_upload(
     Upload and process Kaggle healthcare dataset for batch patient intake.
     """
     try:
-        print(f"Received file upload: {file.filename}")
+        logger.debug("Received file upload", filename=file.filename)
         
         # Validate file type
         if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
             raise HTTPException(status_code=400, detail="Only CSV and Excel files are supported")
         
+        # Reject uploads that announce an oversize body up front
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="File too large")
+        
+        # Spool the upload to disk so it is never held in memory as a whole
+        fd, upload_path = tempfile.mkstemp(prefix="batch_upload_", suffix=Path(file.filename).suffix)
+        os.close(fd)
+        size = 0
+        try:
+            async with aiofiles.open(upload_path, 'wb') as out:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_UPLOAD_BYTES:
+                        raise HTTPException(status_code=413, detail="File too large")
+                    await out.write(chunk)
+        except BaseException:
+            _remove_upload(upload_path)
+            raise
+        logger.debug("Spooled upload", size=size, path=upload_path)
+        
         # Create batch job
-        job_id = str(uuid.uuid4())
-        _batch_jobs[job_id] = {
+        job_id = secrets.token_hex(8)
+        await _put_job(job_id, {
             "job_id": job_id,
             "type": "batch_intake",
             "status": "processing",
             "created_at": datetime.now().isoformat(),
             "total_records": 0,
             "processed_records": 0,
-            "errors": []
-        }
-        
-        print(f"Created batch job: {job_id}")
+            "errors": [],
+            "_upload_path": upload_path
+        })
         
-        # Read file content
-        content = await file.read()
-        print(f"Read {len(content)} bytes from file")
+        logger.debug("Created batch job", job_id=job_id)
         
         # Schedule background processing
-        background_tasks.add_task(process_batch_intake, job_id, content, file.filename)
-        print(f"Scheduled background task for job: {job_id}")
+        background_tasks.add_task(process_batch_intake, job_id, upload_path, file.filename)
+        logger.debug("Scheduled background task", job_id=job_id)
         
         return {
             "job_id": job_id,
@@ -256,46 +451,47 @@ async def batch_intake_upload(
             "message": "Batch intake processing started"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in batch_intake_upload: {str(e)}")
+        logger.exception("Error in batch_intake_upload", error=str(e))
         raise HTTPException(status_code=500, detail=f"Error processing upload: {str(e)}")
 
-async def process_batch_intake(job_id: str, content: bytes, filename: str):
+async def process_batch_intake(job_id: str, upload_path: str, filename: str):
     """Background task to process batch intake."""
     try:
+        job = _batch_jobs.get(job_id)
+        if job and job["status"] == "cancelled":
+            return
+        
         # Update job status
-        _batch_jobs[job_id]["status"] = "processing"
+        await _update_job(job_id, status="processing")
         
-        # Read data based on file type
-        if filename.endswith('.csv'):
-            df = pd.read_csv(pd.io.common.StringIO(content.decode('utf-8')))
-        else:
-            df = pd.read_excel(pd.io.common.BytesIO(content))
+        # Parse off the event loop so other requests keep being served
+        loop = asyncio.get_running_loop()
+        df = await loop.run_in_executor(_parse_executor, read_upload_dataframe, upload_path, filename)
         
-        _batch_jobs[job_id]["total_records"] = len(df)
+        await _update_job(job_id, total_records=len(df))
         
         # Transform data
-        patients, intakes, ehr_records = transform_kaggle_patient_data(df)
-        
-        # Load existing data
-        existing_data = load_sample_data()
+        patients, intakes, ehr_records = await loop.run_in_executor(
+            _parse_executor, transform_kaggle_patient_data, df
+        )
         
         # Append new data
-        existing_data["patients"].extend(patients)
-        existing_data["intakes"].extend(intakes)
-        existing_data["ehr_records"].extend(ehr_records)
-        
-        # Save updated data
-        if save_sample_data(existing_data):
-            _batch_jobs[job_id]["status"] = "completed"
-            _batch_jobs[job_id]["processed_records"] = len(patients)
+        if append_records({
+            "patients": patients,
+            "intakes": intakes,
+            "ehr_records": ehr_records
+        }):
+            await _update_job(job_id, status="completed", processed_records=len(patients))
         else:
-            _batch_jobs[job_id]["status"] = "failed"
-            _batch_jobs[job_id]["errors"].append("Failed to save data")
+            await _update_job(job_id, status="failed", error="Failed to save data")
             
     except Exception as e:
-        _batch_jobs[job_id]["status"] = "failed"
-        _batch_jobs[job_id]["errors"].append(str(e))
+        await _update_job(job_id, status="failed", error=str(e))
+    finally:
+        _remove_upload(upload_path)
 
 @router.post("/care-plans/generate")
 async def batch_generate_care_plans(
@@ -307,8 +503,8 @@ async def batch_generate_care_plans(
     """
     try:
         # Create batch job
-        job_id = str(uuid.uuid4())
-        _batch_jobs[job_id] = {
+        job_id = secrets.token_hex(8)
+        await _put_job(job_id, {
             "job_id": job_id,
             "type": "batch_care_plan_generation",
             "status": "processing",
@@ -317,7 +513,7 @@ async def batch_generate_care_plans(
             "processed_patients": 0,
             "generated_plans": 0,
             "errors": []
-        }
+        })
         
         # Schedule background processing
         background_tasks.add_task(process_batch_care_plan_generation, job_id, force_regenerate)
@@ -340,7 +536,7 @@ async def process_batch_care_plan_generation(job_id: str, force_regenerate: bool
         intakes = data.get("intakes", [])
         existing_care_plans = data.get("care_plans", [])
         
-        _batch_jobs[job_id]["total_patients"] = len(patients)
+        await _update_job(job_id, total_patients=len(patients))
         
         # Find patients without care plans
         patients_with_plans = {cp["patient_id"] for cp in existing_care_plans}
@@ -353,63 +549,69 @@ async def process_batch_care_plan_generation(job_id: str, force_regenerate: bool
         
         # Create intake lookup
         intake_lookup = {intake["patient_id"]: intake for intake in intakes}
+        for patient in patients_needing_plans:
+            intake_lookup.setdefault(patient["patient_id"], {
+                "chief_complaint": patient["medical_condition"],
+                "symptoms": (patient["medical_condition"],)
+            })
         
-        new_care_plans = []
         processed = 0
         
-        for patient in patients_needing_plans:
-            try:
-                # Get patient's intake record
-                patient_intake = intake_lookup.get(
-                    patient["patient_id"], 
-                    {
-                        "chief_complaint": patient["medical_condition"],
-                        "symptoms": [patient["medical_condition"]]
-                    }
-                )
-                
-                # Generate care plan
-                care_plan = await generate_care_plan_for_patient(patient, patient_intake)
-                new_care_plans.append(care_plan)
-                
-                processed += 1
-                _batch_jobs[job_id]["processed_patients"] = processed
-                
-                # Add small delay to simulate realistic processing
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                _batch_jobs[job_id]["errors"].append(f"Error generating plan for {patient['name']}: {str(e)}")
+        async def generate_one(patient: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            nonlocal processed
+            async with _careplan_semaphore:
+                try:
+                    # Get patient's intake record
+                    patient_intake = intake_lookup[patient["patient_id"]]
+                    
+                    care_plan = await generate_care_plan_for_patient(patient, patient_intake)
+                    
+                    processed += 1
+                    await _update_job(job_id, processed_patients=processed)
+                    return care_plan
+                    
+                except Exception as e:
+                    await _update_job(job_id, error=f"Error generating plan for {patient['name']}: {str(e)}")
+                    return None
         
-        # Save new care plans
-        if force_regenerate:
-            data["care_plans"] = new_care_plans
-        else:
-            data["care_plans"].extend(new_care_plans)
+        # Generate care plans concurrently, bounded by _careplan_semaphore
+        results = await asyncio.gather(*(generate_one(p) for p in patients_needing_plans))
+        new_care_plans = [care_plan for care_plan in results if care_plan]
         
-        if save_sample_data(data):
-            _batch_jobs[job_id]["status"] = "completed"
-            _batch_jobs[job_id]["generated_plans"] = len(new_care_plans)
+        # Save new care plans (regeneration replaces all existing plans)
+        if append_records({"care_plans": new_care_plans}, truncate=force_regenerate):
+            await _update_job(job_id, status="completed", generated_plans=len(new_care_plans))
         else:
-            _batch_jobs[job_id]["status"] = "failed"
-            _batch_jobs[job_id]["errors"].append("Failed to save care plans")
+            await _update_job(job_id, status="failed", error="Failed to save care plans")
             
     except Exception as e:
-        _batch_jobs[job_id]["status"] = "failed"
-        _batch_jobs[job_id]["errors"].append(str(e))
+        await _update_job(job_id, status="failed", error=str(e))
 
 @router.get("/jobs/{job_id}")
-async def get_batch_job_status(job_id: str) -> Dict[str, Any]:
-    """Get the status of a batch job."""
+async def get_batch_job_status(
+    job_id: str,
+    wait: bool = False,
+    timeout: float = Query(25.0, gt=0, le=60)
+) -> Dict[str, Any]:
+    """
+    Get the status of a batch job.
+    
+    With wait=true, long-poll until the job changes or the timeout elapses.
+    """
     if job_id not in _batch_jobs:
         raise HTTPException(status_code=404, detail="Batch job not found")
     
-    return _batch_jobs[job_id]
+    job = _batch_jobs[job_id]
+    if wait and job["status"] not in _TERMINAL_STATUSES:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(job["_event"].wait(), timeout)
+    
+    return _public_job(job)
 
 @router.get("/jobs")
 async def list_batch_jobs() -> List[Dict[str, Any]]:
     """List all batch jobs."""
-    return list(_batch_jobs.values())
+    return [_public_job(job) for job in _batch_jobs.values()]
 
 @router.delete("/jobs/{job_id}")
 async def cancel_batch_job(job_id: str) -> Dict[str, str]:
@@ -419,7 +621,8 @@ async def cancel_batch_job(job_id: str) -> Dict[str, str]:
     
     job = _batch_jobs[job_id]
     if job["status"] == "processing":
-        job["status"] = "cancelled"
+        await _update_job(job_id, status="cancelled")
+        _remove_upload(job.get("_upload_path"))
         return {"message": "Batch job cancelled"}
     else:
         return {"message": f"Cannot cancel job with status: {job['status']}"}
@@ -427,12 +630,19 @@ async def cancel_batch_job(job_id: str) -> Dict[str, str]:
 @router.get("/stats")
 async def get_batch_stats() -> Dict[str, Any]:
     """Get statistics about the data in the system."""
-    data = load_sample_data()
+    try:
+        data = _read_sample_data()
+    except Exception as e:
+        logger.exception("Error loading sample data", error=str(e))
+        data = _empty_sample_data()
+    
+    total_patients = len(data.get("patients", []))
+    total_care_plans = len(data.get("care_plans", []))
     
     return {
-        "total_patients": len(data.get("patients", [])),
+        "total_patients": total_patients,
         "total_intakes": len(data.get("intakes", [])),
-        "total_care_plans": len(data.get("care_plans", [])),
-        "patients_without_care_plans": len(data.get("patients", [])) - len(data.get("care_plans", [])),
+        "total_care_plans": total_care_plans,
+        "patients_without_care_plans": total_patients - total_care_plans,
         "care_plan_statuses": {}
     }
\ No newline at end of file
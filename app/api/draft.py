@@ -1,11 +1,11 @@
-from typing import Optional
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Body
 from fastapi.responses import JSONResponse
 
 from ..dependencies import OrchestratorDep
 from ..logging.audit import audit_log
 from ..auth.middleware import get_current_active_user, require_patient_access
-from ..models.auth import User
+from ..models.auth import User, UserRole
 
 router = APIRouter(prefix="/api/draft", tags=["draft"])
 
@@ -21,25 +21,22 @@ async def generate_careplan_draft(
     """Generate AI-powered care plan draft from patient intake data"""
     try:
         # Check patient access permissions
-        from ..models.auth import UserRole
         if current_user.role == UserRole.PATIENT and current_user.patient_id != patient_id:
             raise HTTPException(
                 status_code=403,
                 detail="Access denied to patient data"
             )
         
-        # Check for existing draft
-        if not override_existing:
-            existing_draft = await orchestrator.get_existing_draft(patient_id)
-            if existing_draft:
-                return {
-                    "status": "exists",
-                    "careplan_id": existing_draft.careplan_id,
-                    "message": "Draft already exists. Use override_existing=true to regenerate."
-                }
-        
-        # Generate new draft
-        draft_result = await orchestrator.generate_careplan_draft(patient_id)
+        # Generate new draft (the orchestrator returns an existing one unless overriding)
+        draft_result = await orchestrator.generate_careplan_draft(
+            patient_id, override_existing=override_existing
+        )
+        if draft_result["status"] == "exists":
+            return {
+                "status": "exists",
+                "careplan_id": draft_result["careplan_id"],
+                "message": "Draft already exists. Use override_existing=true to regenerate."
+            }
         
         # Log the generation
         background_tasks.add_task(
@@ -70,6 +67,24 @@ async def generate_careplan_draft(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/exists")
+async def get_existing_drafts(
+    orchestrator: OrchestratorDep,
+    patient_ids: List[str] = Body(..., embed=True, max_length=500),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Optional[str]]:
+    """Look up existing care plan drafts for several patients at once"""
+    if current_user.role == UserRole.PATIENT and any(
+        patient_id != current_user.patient_id for patient_id in patient_ids
+    ):
+        raise HTTPException(
+            status_code=403,
+            detail="Access denied to patient data"
+        )
+    
+    return await orchestrator.get_existing_drafts(patient_ids)
+
+
 @router.get("/{careplan_id}")
 async def get_careplan_draft(careplan_id: str, orchestrator: OrchestratorDep):
     """Retrieve care plan draft by ID"""
@@ -3,9 +3,17 @@ Mock data API endpoints for development and demo purposes.
 Serves sample healthcare data for the web UI.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
 from typing import List, Dict, Any, Optional
-import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import asyncio
+import functools
+import random
+import re
+import anyio
+import orjson
 import os
 from pathlib import Path
 
@@ -14,16 +22,28 @@ router = APIRouter(prefix="/api/mock", tags=["mock-data"])
 # Path to sample data
 SAMPLE_DATA_PATH = Path(__file__).parent.parent.parent / "scripts" / "seed_data" / "sample_data.json"
 
-# In-memory storage for care plan status changes (for demo purposes)
-_care_plan_status_cache = {}
+# In-memory storage for care plan status changes (for demo purposes; bounded, oldest evicted)
+_care_plan_status_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_MAX_CACHED_REVIEWS = 1024
+_review_cache_lock = asyncio.Lock()
+_review_version = 0  # bumped on every review, part of the ETag
+
+# Parsed sample data and its lookup indexes, keyed by the file's (mtime_ns, size)
+_sample_data_cache: Dict[str, Any] = {"key": None, "data": None, "indexes": None}
 
 
 def load_sample_data() -> Dict[str, Any]:
-    """Load sample data from JSON file."""
+    """Load sample data from JSON file (cached until the file changes; treat as read-only)."""
     try:
         if SAMPLE_DATA_PATH.exists():
-            with open(SAMPLE_DATA_PATH, 'r') as f:
-                return json.load(f)
+            stat = SAMPLE_DATA_PATH.stat()
+            key = (stat.st_mtime_ns, stat.st_size)
+            if _sample_data_cache["key"] != key:
+                data = orjson.loads(SAMPLE_DATA_PATH.read_bytes())
+                _sample_data_cache["data"] = data
+                _sample_data_cache["indexes"] = build_indexes(data)
+                _sample_data_cache["key"] = key
+            return _sample_data_cache["data"]
         else:
             # Return empty data if file doesn't exist
             return {
@@ -37,130 +57,301 @@ def load_sample_data() -> Dict[str, Any]:
         return {"patients": [], "intakes": [], "ehr_records": [], "care_plans": []}
 
 
-@router.get("/patients")
-async def get_patients() -> List[Dict[str, Any]]:
-    """Get list of sample patients."""
-    data = load_sample_data()
-    return data.get("patients", [])
+def save_sample_data(data: Dict[str, Any]) -> None:
+    """Write sample data atomically and drop the cached copy (blocking; run off the event loop)."""
+    tmp_path = SAMPLE_DATA_PATH.with_suffix(".json.tmp")
+    tmp_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, SAMPLE_DATA_PATH)
+    _sample_data_cache["key"] = None
+
+
+def build_indexes(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Build ID lookups over the sample data (first record wins, like a linear scan)."""
+    patients_by_id = {}
+    intakes_by_patient = {}
+    ehr_by_patient = {}
+    plans_by_id = {}
+    plans_by_patient = {}
+    
+    for patient in data.get("patients", []):
+        patients_by_id.setdefault(patient.get("patient_id"), patient)
+    for intake in data.get("intakes", []):
+        intakes_by_patient.setdefault(intake.get("patient_id"), intake)
+    for ehr in data.get("ehr_records", []):
+        ehr_by_patient.setdefault(ehr.get("patient_id"), ehr)
+    latest_plan_by_patient = {}
+    for plan in data.get("care_plans", []):
+        patient_id = plan.get("patient_id")
+        plans_by_id.setdefault(plan.get("careplan_id"), plan)
+        plans_by_patient.setdefault(patient_id, []).append(plan)
+        
+        latest = latest_plan_by_patient.get(patient_id)
+        if latest is None or plan.get("last_modified", "") > latest.get("last_modified", ""):
+            latest_plan_by_patient[patient_id] = plan
+    
+    # Care plans as shown to clinicians: with patient names and review defaults
+    clinician_plans = []
+    clinician_plans_by_status = {}
+    clinician_plan_positions = {}
+    for plan in data.get("care_plans", []):
+        patient = patients_by_id.get(plan.get("patient_id"))
+        enhanced_plan = plan.copy()
+        enhanced_plan["patient_name"] = patient.get("name") if patient else "Unknown Patient"
+        enhanced_plan.setdefault("assigned_clinician", "Dr. Maria Garcia")
+        enhanced_plan.setdefault("priority", "medium")
+        clinician_plan_positions.setdefault(plan.get("careplan_id"), len(clinician_plans))
+        clinician_plans.append(enhanced_plan)
+        clinician_plans_by_status.setdefault(enhanced_plan.get("status"), []).append(enhanced_plan)
+    
+    return {
+        "patients_by_id": patients_by_id,
+        "intakes_by_patient": intakes_by_patient,
+        "ehr_by_patient": ehr_by_patient,
+        "plans_by_id": plans_by_id,
+        "plans_by_patient": plans_by_patient,
+        "clinician_plans": clinician_plans,
+        "clinician_plans_by_status": clinician_plans_by_status,
+        "clinician_plan_positions": clinician_plan_positions,
+        "latest_plan_by_patient": latest_plan_by_patient,
+        "clinician_patients": build_clinician_patients(
+            data.get("patients", []), plans_by_patient, latest_plan_by_patient, intakes_by_patient
+        )
+    }
 
 
-@router.get("/patients/{patient_id}")
-async def get_patient(patient_id: str) -> Dict[str, Any]:
-    """Get specific patient by ID."""
-    data = load_sample_data()
-    patients = data.get("patients", [])
+# Condition keywords (matched as substrings) for clinician risk levels
+_HIGH_RISK_PATTERN = re.compile("cancer|diabetes|heart")
+_MEDIUM_RISK_PATTERN = re.compile("hypertension|asthma")
+
+
+@functools.lru_cache(maxsize=256)
+def classify_risk_level(medical_condition: str) -> str:
+    """Classify a medical condition as high, medium or low risk."""
+    condition = medical_condition.lower()
+    if _HIGH_RISK_PATTERN.search(condition):
+        return "high"
+    if _MEDIUM_RISK_PATTERN.search(condition):
+        return "medium"
+    return "low"
+
+
+def build_clinician_patients(
+    patients: List[Dict[str, Any]],
+    care_plan_lookup: Dict[str, List[Dict[str, Any]]],
+    latest_plan_lookup: Dict[str, Dict[str, Any]],
+    intake_lookup: Dict[str, Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Enhance patients with care plan status, risk level and visit dates."""
+    base_date = datetime.now()
     
+    enhanced_patients = []
     for patient in patients:
-        if patient.get("patient_id") == patient_id:
-            return patient
+        patient_id = patient.get("patient_id")
+        
+        # Get patient's care plans
+        patient_care_plans = care_plan_lookup.get(patient_id, [])
+        patient_intake = intake_lookup.get(patient_id)
+        
+        # Determine care plan status from the most recent care plan
+        latest_plan = latest_plan_lookup.get(patient_id)
+        if latest_plan is not None:
+            care_plan_status = latest_plan.get("status", "unknown")
+        else:
+            care_plan_status = "no_plan"
+        
+        # Determine risk level based on medical condition
+        risk_level = classify_risk_level(patient.get("medical_condition", ""))
+        
+        # Generate realistic visit dates based on care plan activity
+        last_visit = "2024-01-15"  # Default
+        next_appointment = "Not scheduled"  # Default
+        
+        if patient_care_plans:
+            # If patient has care plans, generate more recent dates (stable per patient)
+            rng = random.Random(patient_id)
+            last_visit_date = base_date - timedelta(days=rng.randint(1, 30))
+            last_visit = last_visit_date.strftime("%Y-%m-%d")
+            
+            if care_plan_status in ["approved", "under_review"]:
+                next_appointment_date = base_date + timedelta(days=rng.randint(1, 14))
+                next_appointment = next_appointment_date.strftime("%Y-%m-%d")
+        
+        enhanced_patients.append({
+            **patient,
+            "last_visit": last_visit,
+            "next_appointment": next_appointment,
+            "care_plan_status": care_plan_status,
+            "risk_level": risk_level,
+            "care_plans_count": len(patient_care_plans),
+            "has_intake": patient_intake is not None
+        })
     
-    raise HTTPException(status_code=404, detail="Patient not found")
+    return enhanced_patients
 
 
-@router.get("/patients/{patient_id}/intake")
-async def get_patient_intake(patient_id: str) -> Dict[str, Any]:
-    """Get patient intake data."""
+def load_sample_indexes() -> Dict[str, Dict[str, Any]]:
+    """Load the ID lookups for the current sample data."""
     data = load_sample_data()
-    intakes = data.get("intakes", [])
+    if data is _sample_data_cache["data"]:
+        return _sample_data_cache["indexes"]
+    return build_indexes(data)
+
+
+def sample_data_etag() -> str:
+    """ETag for responses derived from the sample data and cached review results."""
+    try:
+        stat = SAMPLE_DATA_PATH.stat()
+        mtime_ns, size = stat.st_mtime_ns, stat.st_size
+    except FileNotFoundError:
+        mtime_ns, size = 0, 0
+    return f'"{mtime_ns:x}-{size:x}-{_review_version:x}"'
+
+
+async def check_sample_data_etag(request: Request, response: Response) -> None:
+    """Answer 304 when the client's copy is current; otherwise tag the response."""
+    etag = sample_data_etag()
+    if request.headers.get("if-none-match") == etag:
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+
+async def _store_review(careplan_id: str, review: Dict[str, Any]) -> None:
+    """Record a review result, evicting the oldest beyond _MAX_CACHED_REVIEWS."""
+    # Precompute the fields merged into the care plan on read (edits keep the status)
+    overlay = {
+        "reviewer_comments": review.get("comments"),
+        "last_review_date": review.get("reviewed_at")
+    }
+    if "status" in review:
+        overlay["status"] = review["status"]
+    review["overlay"] = overlay
+    
+    global _review_version
+    async with _review_cache_lock:
+        _care_plan_status_cache[careplan_id] = review
+        _review_version += 1
+        _care_plan_status_cache.move_to_end(careplan_id)
+        while len(_care_plan_status_cache) > _MAX_CACHED_REVIEWS:
+            _care_plan_status_cache.popitem(last=False)
+
+
+def _json_response(content: Any, response: Response) -> ORJSONResponse:
+    """Serialize a (precomputed) collection straight to JSON, skipping response-model re-encoding."""
+    return ORJSONResponse(content, headers=dict(response.headers))
+
+
+def _cached_json_response(
+    indexes: Dict[str, Dict[str, Any]],
+    key: str,
+    content: Any,
+    response: Response
+) -> Response:
+    """Serve precomputed index content from bytes serialized once per sample-data load."""
+    serialized = indexes.setdefault("serialized", {})
+    body = serialized.get(key)
+    if body is None:
+        body = serialized[key] = orjson.dumps(content)
+    return Response(body, media_type="application/json", headers=dict(response.headers))
+
+
+def _apply_review(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the plan with any cached review result merged in (copied only when reviewed)."""
+    review = _care_plan_status_cache.get(plan.get("careplan_id"))
+    if review is None:
+        return plan
+    return {**plan, **review["overlay"]}
+
+
+@router.get("/patients", dependencies=[Depends(check_sample_data_etag)])
+async def get_patients(response: Response) -> List[Dict[str, Any]]:
+    """Get list of sample patients."""
+    response.headers["Cache-Control"] = "private, max-age=5"
+    data = load_sample_data()
+    if data is _sample_data_cache["data"]:
+        return _cached_json_response(_sample_data_cache["indexes"], "patients", data.get("patients", []), response)
+    return _json_response(data.get("patients", []), response)
+
+
+@router.get("/patients/{patient_id}", dependencies=[Depends(check_sample_data_etag)])
+async def get_patient(patient_id: str, response: Response) -> Dict[str, Any]:
+    """Get specific patient by ID."""
+    patient = load_sample_indexes()["patients_by_id"].get(patient_id)
+    if patient is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
     
-    for intake in intakes:
-        if intake.get("patient_id") == patient_id:
-            return intake
+    return _json_response(patient, response)
+
+
+@router.get("/patients/{patient_id}/intake", dependencies=[Depends(check_sample_data_etag)])
+async def get_patient_intake(patient_id: str, response: Response) -> Dict[str, Any]:
+    """Get patient intake data."""
+    intake = load_sample_indexes()["intakes_by_patient"].get(patient_id)
+    if intake is None:
+        raise HTTPException(status_code=404, detail="Patient intake not found")
     
-    raise HTTPException(status_code=404, detail="Patient intake not found")
+    return _json_response(intake, response)
 
 
-@router.get("/patients/{patient_id}/ehr")
-async def get_patient_ehr(patient_id: str) -> Dict[str, Any]:
+@router.get("/patients/{patient_id}/ehr", dependencies=[Depends(check_sample_data_etag)])
+async def get_patient_ehr(patient_id: str, response: Response) -> Dict[str, Any]:
     """Get patient EHR data."""
-    data = load_sample_data()
-    ehr_records = data.get("ehr_records", [])
+    ehr = load_sample_indexes()["ehr_by_patient"].get(patient_id)
+    if ehr is None:
+        raise HTTPException(status_code=404, detail="EHR record not found")
     
-    for ehr in ehr_records:
-        if ehr.get("patient_id") == patient_id:
-            return ehr
-    
-    raise HTTPException(status_code=404, detail="EHR record not found")
+    return _json_response(ehr, response)
 
 
-@router.get("/patients/{patient_id}/care-plans")
-async def get_patient_care_plans(patient_id: str) -> List[Dict[str, Any]]:
+@router.get("/patients/{patient_id}/care-plans", dependencies=[Depends(check_sample_data_etag)])
+async def get_patient_care_plans(patient_id: str, response: Response) -> List[Dict[str, Any]]:
     """Get patient care plans from actual data."""
-    data = load_sample_data()
-    care_plans = data.get("care_plans", [])
-    
-    # Filter care plans for the specific patient
-    patient_plans = [cp for cp in care_plans if cp.get("patient_id") == patient_id]
+    care_plans = load_sample_indexes()["plans_by_patient"].get(patient_id, [])
     
     # Apply any status updates from the cache
-    for plan in patient_plans:
-        careplan_id = plan.get("careplan_id")
-        if careplan_id in _care_plan_status_cache:
-            cached_data = _care_plan_status_cache[careplan_id]
-            plan["status"] = cached_data["status"]
-            plan["reviewer_comments"] = cached_data.get("comments")
-            plan["last_review_date"] = cached_data.get("reviewed_at")
-    
-    return patient_plans
+    return _json_response([_apply_review(plan) for plan in care_plans], response)
 
 
-@router.get("/care-plans/{careplan_id}")
-async def get_care_plan(careplan_id: str) -> Dict[str, Any]:
+@router.get("/care-plans/{careplan_id}", dependencies=[Depends(check_sample_data_etag)])
+async def get_care_plan(careplan_id: str, response: Response) -> Dict[str, Any]:
     """Get specific care plan by ID from actual data."""
-    data = load_sample_data()
-    care_plans = data.get("care_plans", [])
-    
-    for plan in care_plans:
-        if plan.get("careplan_id") == careplan_id:
-            # Apply any status updates from the cache
-            if careplan_id in _care_plan_status_cache:
-                cached_data = _care_plan_status_cache[careplan_id]
-                plan["status"] = cached_data["status"]
-                plan["reviewer_comments"] = cached_data.get("comments")
-                plan["last_review_date"] = cached_data.get("reviewed_at")
-            return plan
+    plan = load_sample_indexes()["plans_by_id"].get(careplan_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Care plan not found")
     
-    raise HTTPException(status_code=404, detail="Care plan not found")
+    # Apply any status updates from the cache
+    return _json_response(_apply_review(plan), response)
 
 
-@router.get("/clinician/care-plans")
-async def get_all_care_plans_for_clinician(status: Optional[str] = None) -> List[Dict[str, Any]]:
+@router.get("/clinician/care-plans", dependencies=[Depends(check_sample_data_etag)])
+async def get_all_care_plans_for_clinician(
+    response: Response,
+    status: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """Get all care plans for clinician review from actual data."""
-    data = load_sample_data()
-    care_plans = data.get("care_plans", [])
-    patients = data.get("patients", [])
-    
-    # Create a lookup for patient names
-    patient_lookup = {p.get("patient_id"): p.get("name") for p in patients}
-    
-    # Enhance care plans with patient names and apply cached status updates
-    enhanced_care_plans = []
-    for plan in care_plans:
-        enhanced_plan = plan.copy()
-        
-        # Add patient name
-        patient_id = plan.get("patient_id")
-        enhanced_plan["patient_name"] = patient_lookup.get(patient_id, "Unknown Patient")
-        
-        # Apply any status updates from the cache
-        careplan_id = plan.get("careplan_id")
-        if careplan_id in _care_plan_status_cache:
-            cached_data = _care_plan_status_cache[careplan_id]
-            enhanced_plan["status"] = cached_data["status"]
-            enhanced_plan["reviewer_comments"] = cached_data.get("comments")
-            enhanced_plan["last_review_date"] = cached_data.get("reviewed_at")
-        
-        # Add clinician-specific fields if missing
-        enhanced_plan.setdefault("assigned_clinician", "Dr. Maria Garcia")
-        enhanced_plan.setdefault("priority", "medium")
-        
-        enhanced_care_plans.append(enhanced_plan)
+    indexes = load_sample_indexes()
+    
+    # Without review overrides the precomputed lists can be served as-is
+    if not _care_plan_status_cache:
+        if status:
+            by_status = indexes["clinician_plans_by_status"]
+            if status not in by_status:
+                return _json_response([], response)
+            return _cached_json_response(indexes, f"clinician_plans:{status}", by_status[status], response)
+        return _cached_json_response(indexes, "clinician_plans", indexes["clinician_plans"], response)
+    
+    # Overlay cached review results on just the plans they touch
+    enhanced_care_plans = list(indexes["clinician_plans"])
+    positions = indexes["clinician_plan_positions"]
+    for careplan_id, review in _care_plan_status_cache.items():
+        position = positions.get(careplan_id)
+        if position is not None:
+            enhanced_care_plans[position] = {**enhanced_care_plans[position], **review["overlay"]}
     
     # Filter by status if provided
     if status:
-        enhanced_care_plans = [cp for cp in enhanced_care_plans if cp.get("status") == status]
+        enhanced_care_plans = [plan for plan in enhanced_care_plans if plan.get("status") == status]
     
-    return enhanced_care_plans
+    return _json_response(enhanced_care_plans, response)
 
 
 @router.put("/care-plans/{careplan_id}/review")
@@ -173,134 +364,36 @@ async def submit_care_plan_review(careplan_id: str, review_data: Dict[str, Any])
     if action not in ["approve", "deny", "edit"]:
         raise HTTPException(status_code=400, detail="Action must be 'approve', 'deny', or 'edit'")
     
-    # Store the review result in our cache
-    if action == "edit":
-        # For edit action, keep the current status but apply modifications
-        new_status = None  # Don't change status for edits
-        reviewed_at = "2024-01-15T15:30:00Z"
-    else:
-        new_status = "approved" if action == "approve" else "denied"
-        reviewed_at = "2024-01-15T15:30:00Z"
+    # Store the review result in our cache; edits keep the current status
+    review = {
+        "comments": comments,
+        "reviewed_at": "2024-01-15T15:30:00Z",
+        "reviewer": "Dr. Maria Garcia"
+    }
+    if modifications:
+        review["modifications"] = modifications
+    if action != "edit":
+        review["status"] = "approved" if action == "approve" else "denied"
+    await _store_review(careplan_id, review)
     
-    # For edit actions, only store modifications and comments, not status changes
-    if action == "edit":
-        _care_plan_status_cache[careplan_id] = {
-            "comments": comments,
-            "reviewed_at": reviewed_at,
-            "modifications": modifications,
-            "reviewer": "Dr. Maria Garcia"
-        }
-        
-        return {
-            "careplan_id": careplan_id,
-            "status": "modified",  # Indicate it was modified but keep original status
-            "reviewer_comments": comments,
-            "modifications_applied": len(modifications) > 0,
-            "reviewed_at": reviewed_at,
-            "reviewer": "Dr. Maria Garcia"
-        }
-    else:
-        _care_plan_status_cache[careplan_id] = {
-            "status": new_status,
-            "comments": comments,
-            "reviewed_at": reviewed_at,
-            "modifications": modifications,
-            "reviewer": "Dr. Maria Garcia"
-        }
-        
-        return {
-            "careplan_id": careplan_id,
-            "status": new_status,
-            "reviewer_comments": comments,
-            "modifications_applied": len(modifications) > 0,
-            "reviewed_at": reviewed_at,
-            "reviewer": "Dr. Maria Garcia"
-        }
+    return {
+        "careplan_id": careplan_id,
+        "status": review.get("status", "modified"),  # "modified" keeps the original status
+        "reviewer_comments": comments,
+        "modifications_applied": bool(modifications),
+        "reviewed_at": review["reviewed_at"],
+        "reviewer": review["reviewer"]
+    }
 
 
-@router.get("/clinician/patients")
-async def get_clinician_patients() -> List[Dict[str, Any]]:
+@router.get("/clinician/patients", dependencies=[Depends(check_sample_data_etag)])
+async def get_clinician_patients(response: Response) -> List[Dict[str, Any]]:
     """Get all patients assigned to the clinician with real care plan data."""
-    data = load_sample_data()
-    patients = data.get("patients", [])
-    care_plans = data.get("care_plans", [])
-    intakes = data.get("intakes", [])
-    
-    # Create lookup dictionaries for efficient matching
-    care_plan_lookup = {}
-    intake_lookup = {}
-    
-    for plan in care_plans:
-        patient_id = plan.get("patient_id")
-        if patient_id:
-            if patient_id not in care_plan_lookup:
-                care_plan_lookup[patient_id] = []
-            care_plan_lookup[patient_id].append(plan)
-    
-    for intake in intakes:
-        patient_id = intake.get("patient_id")
-        if patient_id:
-            intake_lookup[patient_id] = intake
-    
-    # Enhance patients with real data
-    enhanced_patients = []
-    for patient in patients:
-        patient_id = patient.get("patient_id")
-        
-        # Get patient's care plans
-        patient_care_plans = care_plan_lookup.get(patient_id, [])
-        patient_intake = intake_lookup.get(patient_id)
-        
-        # Determine care plan status from actual care plans
-        if patient_care_plans:
-            # Get the most recent care plan
-            latest_plan = max(patient_care_plans, key=lambda p: p.get("last_modified", ""))
-            care_plan_status = latest_plan.get("status", "unknown")
-        else:
-            care_plan_status = "no_plan"
-        
-        # Determine risk level based on medical condition and care plan data
-        medical_condition = patient.get("medical_condition", "").lower()
-        if "cancer" in medical_condition or "diabetes" in medical_condition or "heart" in medical_condition:
-            risk_level = "high"
-        elif "hypertension" in medical_condition or "asthma" in medical_condition:
-            risk_level = "medium"
-        else:
-            risk_level = "low"
-        
-        # Generate realistic visit dates based on care plan activity
-        last_visit = "2024-01-15"  # Default
-        next_appointment = "Not scheduled"  # Default
-        
-        if patient_care_plans:
-            # If patient has care plans, generate more recent dates
-            from datetime import datetime, timedelta
-            import random
-            
-            base_date = datetime.now()
-            last_visit_date = base_date - timedelta(days=random.randint(1, 30))
-            last_visit = last_visit_date.strftime("%Y-%m-%d")
-            
-            if care_plan_status in ["approved", "under_review"]:
-                next_appointment_date = base_date + timedelta(days=random.randint(1, 14))
-                next_appointment = next_appointment_date.strftime("%Y-%m-%d")
-        
-        enhanced_patient = {
-            **patient,
-            "last_visit": last_visit,
-            "next_appointment": next_appointment,
-            "care_plan_status": care_plan_status,
-            "risk_level": risk_level,
-            "care_plans_count": len(patient_care_plans),
-            "has_intake": patient_intake is not None
-        }
-        
-        enhanced_patients.append(enhanced_patient)
-    
-    return enhanced_patients
+    indexes = load_sample_indexes()
+    return _cached_json_response(indexes, "clinician_patients", indexes["clinician_patients"], response)
 
 
-@router.get("/dashboard-stats")
+@router.get("/dashboard-stats", dependencies=[Depends(check_sample_data_etag)])
 async def get_dashboard_stats(patient_id: Optional[str] = None) -> Dict[str, Any]:
     """Get dashboard statistics."""
     data = load_sample_data()
@@ -420,9 +513,10 @@ async def generate_sample_data(num_patients: int = 50) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Error generating sample data: {str(e)}")
 
 
-@router.get("/data-info")
-async def get_data_info() -> Dict[str, Any]:
+@router.get("/data-info", dependencies=[Depends(check_sample_data_etag)])
+async def get_data_info(response: Response) -> Dict[str, Any]:
     """Get information about the loaded sample data."""
+    response.headers["Cache-Control"] = "private, max-age=5"
     data = load_sample_data()
     
     return {
@@ -442,12 +536,53 @@ async def get_data_info() -> Dict[str, Any]:
     }
 
 
+# Templates for generated mock care plans ({cond} is the lowercased condition)
+_MOCK_ACTION_TEMPLATES = (
+    {
+        "action_type": "medication",
+        "description": "Continue current {cond} medication regimen as prescribed",
+        "priority": "high",
+        "timeline": "ongoing",
+        "rationale": "Medication compliance is essential for effective {cond} management",
+        "evidence_source": "Clinical guidelines"
+    },
+    {
+        "action_type": "lifestyle",
+        "description": "Implement lifestyle modifications to support {cond} treatment",
+        "priority": "medium",
+        "timeline": "within 2 weeks",
+        "rationale": "Lifestyle interventions complement medical therapy",
+        "evidence_source": "Evidence-based practice guidelines"
+    },
+    {
+        "action_type": "monitoring",
+        "description": "Regular monitoring and follow-up appointments",
+        "priority": "high",
+        "timeline": "monthly",
+        "rationale": "Ongoing monitoring ensures treatment effectiveness",
+        "evidence_source": "Standard of care"
+    }
+)
+_MOCK_SHORT_TERM_GOALS = (
+    "Stabilize {cond} symptoms within 4 weeks",
+    "Improve quality of life and daily functioning",
+    "Achieve medication compliance > 90%"
+)
+_MOCK_LONG_TERM_GOALS = (
+    "Prevent {cond} complications",
+    "Maintain independent living",
+    "Optimize overall health status"
+)
+_MOCK_SUCCESS_METRICS = (
+    "Symptom severity score improvement",
+    "Functional status assessment",
+    "Patient-reported outcomes"
+)
+
+
 @router.post("/generate-care-plans")
 async def generate_care_plans() -> Dict[str, Any]:
     """Generate care plans for existing patients."""
-    import json
-    from datetime import datetime, timedelta
-    
     data = load_sample_data()
     patients = data.get("patients", [])
     
@@ -456,80 +591,56 @@ async def generate_care_plans() -> Dict[str, Any]:
     
     care_plans = []
     statuses = ["under_review", "approved", "completed"]
+    now = datetime.now()
     
     for i, patient in enumerate(patients):
         patient_id = patient.get("patient_id")
         medical_condition = patient.get("medical_condition", "General Health")
+        condition = medical_condition.lower()
+        
+        status = statuses[i % len(statuses)]
+        created_date = (now - timedelta(days=30 - i)).isoformat()
+        
+        # Text shared by every plan for this patient
+        short_term_goals = [goal.format(cond=condition) for goal in _MOCK_SHORT_TERM_GOALS]
+        long_term_goals = [goal.format(cond=condition) for goal in _MOCK_LONG_TERM_GOALS]
+        action_texts = [
+            (template, template["description"].format(cond=condition), template["rationale"].format(cond=condition))
+            for template in _MOCK_ACTION_TEMPLATES
+        ]
         
         # Create 1-2 care plans per patient
         num_plans = 1 if i % 2 == 0 else 2
         
         for plan_idx in range(num_plans):
-            status = statuses[i % len(statuses)]
             careplan_id = f"cp_{patient_id}_{plan_idx}_{status}"
             
-            created_date = datetime.now() - timedelta(days=30 - i)
-            
             care_plan = {
                 "careplan_id": careplan_id,
                 "patient_id": patient_id,
-                "created_date": created_date.isoformat(),
-                "last_modified": created_date.isoformat(),
+                "created_date": created_date,
+                "last_modified": created_date,
                 "status": status,
                 "version": 1,
                 "primary_diagnosis": medical_condition,
                 "secondary_diagnoses": [],
-                "chief_complaint": f"Management and treatment of {medical_condition.lower()}",
-                "clinical_summary": f"Patient presents with {medical_condition.lower()} requiring comprehensive care coordination and evidence-based treatment approach. Current clinical status shows good response to therapy with continued monitoring needed.",
+                "chief_complaint": f"Management and treatment of {condition}",
+                "clinical_summary": f"Patient presents with {condition} requiring comprehensive care coordination and evidence-based treatment approach. Current clinical status shows good response to therapy with continued monitoring needed.",
                 "actions": [
                     {
-                        "action_id": f"action_{careplan_id}_1",
-                        "action_type": "medication",
-                        "description": f"Continue current {medical_condition.lower()} medication regimen as prescribed",
-                        "priority": "high",
-                        "timeline": "ongoing",
-                        "rationale": f"Medication compliance is essential for effective {medical_condition.lower()} management",
-                        "evidence_source": "Clinical guidelines",
-                        "contraindications": []
-                    },
-                    {
-                        "action_id": f"action_{careplan_id}_2",
-                        "action_type": "lifestyle",
-                        "description": f"Implement lifestyle modifications to support {medical_condition.lower()} treatment",
-                        "priority": "medium",
-                        "timeline": "within 2 weeks",
-                        "rationale": "Lifestyle interventions complement medical therapy",
-                        "evidence_source": "Evidence-based practice guidelines",
-                        "contraindications": []
-                    },
-                    {
-                        "action_id": f"action_{careplan_id}_3",
-                        "action_type": "monitoring",
-                        "description": "Regular monitoring and follow-up appointments",
-                        "priority": "high",
-                        "timeline": "monthly",
-                        "rationale": "Ongoing monitoring ensures treatment effectiveness",
-                        "evidence_source": "Standard of care",
+                        "action_id": f"action_{careplan_id}_{number}",
+                        **template,
+                        "description": description,
+                        "rationale": rationale,
                         "contraindications": []
                     }
+                    for number, (template, description, rationale) in enumerate(action_texts, 1)
                 ],
-                "short_term_goals": [
-                    f"Stabilize {medical_condition.lower()} symptoms within 4 weeks",
-                    "Improve quality of life and daily functioning",
-                    "Achieve medication compliance > 90%"
-                ],
-                "long_term_goals": [
-                    f"Prevent {medical_condition.lower()} complications",
-                    "Maintain independent living",
-                    "Optimize overall health status"
-                ],
-                "success_metrics": [
-                    "Symptom severity score improvement",
-                    "Functional status assessment",
-                    "Patient-reported outcomes"
-                ],
+                "short_term_goals": list(short_term_goals),
+                "long_term_goals": list(long_term_goals),
+                "success_metrics": list(_MOCK_SUCCESS_METRICS),
                 "clinician_reviews": [],
-                "patient_instructions": f"Continue taking prescribed medications for {medical_condition.lower()} as directed. Follow lifestyle recommendations provided. Attend all scheduled follow-up appointments.",
+                "patient_instructions": f"Continue taking prescribed medications for {condition} as directed. Follow lifestyle recommendations provided. Attend all scheduled follow-up appointments.",
                 "educational_resources": [
                     f"Understanding {medical_condition}",
                     "Medication adherence guide",
@@ -541,11 +652,10 @@ async def generate_care_plans() -> Dict[str, Any]:
             care_plans.append(care_plan)
     
     # Update the sample data file
-    data["care_plans"] = care_plans
+    data = {**data, "care_plans": care_plans}
     
     try:
-        with open(SAMPLE_DATA_PATH, 'w') as f:
-            json.dump(data, f, indent=2)
+        await anyio.to_thread.run_sync(save_sample_data, data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving care plans: {str(e)}")
     
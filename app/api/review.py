@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, BackgroundTasks
 
 from ..dependencies import ReviewServiceDep
 from ..review.service import ReviewRequest, ApprovalRequest
@@ -14,15 +14,12 @@ async def get_pending_reviews(
     reviewer_id: Optional[str] = None
 ):
     """Get all care plans pending review"""
-    try:
-        pending_plans = await review_service.get_pending_reviews(reviewer_id)
-        return {
-            "status": "success",
-            "pending_count": len(pending_plans),
-            "care_plans": pending_plans
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    pending_plans = await review_service.get_pending_reviews(reviewer_id)
+    return {
+        "status": "success",
+        "pending_count": len(pending_plans),
+        "care_plans": pending_plans
+    }
 
 
 @router.post("/{careplan_id}/review")
@@ -33,31 +30,28 @@ async def submit_review(
     review_service: ReviewServiceDep
 ):
     """Submit clinician review for a care plan draft"""
-    try:
-        review_result = await review_service.submit_review(
-            careplan_id, review_request
-        )
-        
-        background_tasks.add_task(
-            audit_log,
-            action="careplan_reviewed",
-            careplan_id=careplan_id,
-            reviewer_id=review_request.reviewer_id,
-            details={
-                "status": review_request.status,
-                "has_modifications": len(review_request.modifications) > 0
-            }
-        )
-        
-        return {
-            "status": "success",
-            "careplan_id": careplan_id,
-            "review_status": review_request.status,
-            "message": "Review submitted successfully"
+    review_result = await review_service.submit_review(
+        careplan_id, review_request
+    )
+    review_status = review_request.status
+    
+    background_tasks.add_task(
+        audit_log,
+        action="careplan_reviewed",
+        careplan_id=careplan_id,
+        reviewer_id=review_request.reviewer_id,
+        details={
+            "status": review_status,
+            "has_modifications": bool(review_request.modifications)
         }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    )
+    
+    return {
+        "status": "success",
+        "careplan_id": careplan_id,
+        "review_status": review_status,
+        "message": "Review submitted successfully"
+    }
 
 
 @router.post("/{careplan_id}/approve")
@@ -68,28 +62,24 @@ async def approve_careplan(
     review_service: ReviewServiceDep
 ):
     """Final approval of care plan for patient delivery"""
-    try:
-        approval_result = await review_service.approve_careplan(
-            careplan_id, approval_request
-        )
-        
-        background_tasks.add_task(
-            audit_log,
-            action="careplan_approved",
-            careplan_id=careplan_id,
-            approver_id=approval_request.approver_id,
-            details={"final_comments": approval_request.final_comments}
-        )
-        
-        return {
-            "status": "success",
-            "careplan_id": careplan_id,
-            "approved_by": approval_request.approver_name,
-            "message": "Care plan approved and ready for patient delivery"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    approval_result = await review_service.approve_careplan(
+        careplan_id, approval_request
+    )
+    
+    background_tasks.add_task(
+        audit_log,
+        action="careplan_approved",
+        careplan_id=careplan_id,
+        approver_id=approval_request.approver_id,
+        details={"final_comments": approval_request.final_comments}
+    )
+    
+    return {
+        "status": "success",
+        "careplan_id": careplan_id,
+        "approved_by": approval_request.approver_name,
+        "message": "Care plan approved and ready for patient delivery"
+    }
 
 
 @router.get("/{careplan_id}/history")
@@ -98,14 +88,11 @@ async def get_review_history(
     review_service: ReviewServiceDep
 ):
     """Get review history for a care plan"""
-    try:
-        history = await review_service.get_review_history(careplan_id)
-        return {
-            "careplan_id": careplan_id,
-            "review_history": history
-        }
-    except Exception as e:
-        raise HTTPException(status_code=404, detail="Care plan not found")
+    history = await review_service.get_review_history(careplan_id)
+    return {
+        "careplan_id": careplan_id,
+        "review_history": history
+    }
 
 
 @router.post("/{careplan_id}/send-to-patient")
@@ -115,21 +102,17 @@ async def send_to_patient(
     review_service: ReviewServiceDep
 ):
     """Send approved care plan to patient"""
-    try:
-        send_result = await review_service.send_to_patient(careplan_id)
-        
-        background_tasks.add_task(
-            audit_log,
-            action="careplan_sent_to_patient",
-            careplan_id=careplan_id,
-            details={"delivery_method": send_result.get("delivery_method")}
-        )
-        
-        return {
-            "status": "success",
-            "careplan_id": careplan_id,
-            "message": "Care plan sent to patient successfully"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    send_result = await review_service.send_to_patient(careplan_id)
+    
+    background_tasks.add_task(
+        audit_log,
+        action="careplan_sent_to_patient",
+        careplan_id=careplan_id,
+        details={"delivery_method": send_result.get("delivery_method")}
+    )
+    
+    return {
+        "status": "success",
+        "careplan_id": careplan_id,
+        "message": "Care plan sent to patient successfully"
+    }
@@ -1,11 +1,15 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Body
+from pydantic import BaseModel, ConfigDict
 
 router = APIRouter(prefix="/api/review", tags=["review"])
 
 
+# Request shapes for reference; the mock handlers below take raw JSON bodies
+# so they skip validation, and the schemas are only built if someone uses them
 class ReviewRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     reviewer_id: str
     reviewer_name: str
     status: str
@@ -14,6 +18,8 @@ class ReviewRequest(BaseModel):
 
 
 class ApprovalRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     approver_id: str
     approver_name: str
     final_comments: Optional[str] = None
@@ -32,14 +38,14 @@ async def get_pending_reviews(reviewer_id: Optional[str] = None):
 @router.post("/{careplan_id}/review")
 async def submit_review(
     careplan_id: str,
-    review_request: ReviewRequest,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    review_request: Dict[str, Any] = Body(...)
 ):
     """Submit clinician review for a care plan draft (Mock)"""
     return {
         "status": "success",
         "careplan_id": careplan_id,
-        "review_status": review_request.status,
+        "review_status": review_request.get("status"),
         "message": "Review submitted successfully (mock)"
     }
 
@@ -47,14 +53,14 @@ async def submit_review(
 @router.post("/{careplan_id}/approve")
 async def approve_careplan(
     careplan_id: str,
-    approval_request: ApprovalRequest,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    approval_request: Dict[str, Any] = Body(...)
 ):
     """Final approval of care plan for patient delivery (Mock)"""
     return {
         "status": "success",
         "careplan_id": careplan_id,
-        "approved_by": approval_request.approver_name,
+        "approved_by": approval_request.get("approver_name"),
         "message": "Care plan approved and ready for patient delivery (mock)"
     }
 
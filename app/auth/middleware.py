@@ -1,13 +1,48 @@
 from typing import Optional, List
+from dataclasses import dataclass
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from functools import wraps
 
-from ..models.auth import User, UserRole
+from ..models.auth import User, UserRole, UserSession, UserStatus
 from .service import AuthenticationService
 
 security = HTTPBearer()
 
+_BEARER_CHALLENGE = {"WWW-Authenticate": "Bearer"}
+_PATIENT_DATA_ROLES = frozenset({UserRole.PATIENT, UserRole.CLINICIAN, UserRole.ADMIN})
+
+
+# Exception factories: a fresh instance per raise, so shared instances never
+# accumulate tracebacks (and the request frames they reference)
+def _invalid_token() -> HTTPException:
+    """401 for a missing, invalid or expired bearer token"""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired token",
+        headers=_BEARER_CHALLENGE
+    )
+
+
+def _not_authenticated() -> HTTPException:
+    """401 for a request without an authenticated user"""
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+
+
+def _inactive_user() -> HTTPException:
+    """400 for an authenticated but inactive account"""
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user account")
+
+
+def _forbidden_role() -> HTTPException:
+    """403 for a user whose role isn't allowed"""
+    return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+
+
+def _forbidden_patient() -> HTTPException:
+    """403 for a patient reaching for someone else's data"""
+    return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to patient data")
+
 
 class AuthenticationMiddleware:
     """Authentication middleware for protecting routes"""
@@ -22,11 +57,7 @@ class AuthenticationMiddleware:
         """Get current authenticated user"""
         user_session = await self.auth_service.validate_session(credentials.credentials)
         if not user_session:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+            raise _invalid_token()
         
         user, _ = user_session
         return user
@@ -38,33 +69,23 @@ class AuthenticationMiddleware:
         """Get current active user"""
         if not current_user:
             # This dependency will be properly injected
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Not authenticated"
-            )
+            raise _not_authenticated()
         
         if current_user.status.value != "active":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Inactive user account"
-            )
+            raise _inactive_user()
         
         return current_user
     
     def require_roles(self, allowed_roles: List[UserRole]):
         """Dependency factory for role-based access control"""
+        allowed = frozenset(allowed_roles)
+        
         async def role_checker(current_user: User = Depends(lambda: None)) -> User:
             if not current_user:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Not authenticated"
-                )
+                raise _not_authenticated()
             
-            if current_user.role not in allowed_roles:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Insufficient permissions"
-                )
+            if current_user.role not in allowed:
+                raise _forbidden_role()
             
             return current_user
         
@@ -74,24 +95,15 @@ class AuthenticationMiddleware:
         """Require patient to access their own data only"""
         async def patient_access_checker(current_user: User = Depends(lambda: None)) -> User:
             if not current_user:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Not authenticated"
-                )
+                raise _not_authenticated()
             
             # Patients can only access their own data
             if current_user.role == UserRole.PATIENT and current_user.patient_id != patient_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Access denied to patient data"
-                )
+                raise _forbidden_patient()
             
             # Clinicians and admins can access any patient data
-            if current_user.role not in [UserRole.PATIENT, UserRole.CLINICIAN, UserRole.ADMIN]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Insufficient permissions"
-                )
+            if current_user.role not in _PATIENT_DATA_ROLES:
+                raise _forbidden_role()
             
             return current_user
         
@@ -104,50 +116,59 @@ auth_service = AuthenticationService()
 auth_middleware = AuthenticationMiddleware(auth_service)
 
 
-# Convenience dependency functions
-async def get_current_user(
+@dataclass(slots=True)
+class AuthContext:
+    """The authenticated user and session for a request"""
+    user: User
+    session: UserSession
+
+
+async def auth_context(
     credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
+) -> AuthContext:
+    """Validate the bearer token once per request"""
+    user_session = await auth_service.validate_session(credentials.credentials)
+    if not user_session:
+        raise _invalid_token()
+    return AuthContext(*user_session)
+
+
+# Convenience dependency functions
+async def get_current_user(ctx: AuthContext = Depends(auth_context)) -> User:
     """Get current authenticated user"""
-    return await auth_middleware.get_current_user(credentials)
+    return ctx.user
 
 
-async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+async def get_current_active_user(ctx: AuthContext = Depends(auth_context)) -> User:
     """Get current active user"""
-    return await auth_middleware.get_current_active_user(current_user)
+    if ctx.user.status != UserStatus.ACTIVE:
+        raise _inactive_user()
+    return ctx.user
 
 
 def require_roles(allowed_roles: List[UserRole]):
     """Dependency for role-based access control"""
-    async def role_checker(current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role not in allowed_roles:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Insufficient permissions"
-            )
-        return current_user
+    allowed = frozenset(allowed_roles)
+    
+    async def role_checker(ctx: AuthContext = Depends(auth_context)) -> User:
+        if ctx.user.role not in allowed:
+            raise _forbidden_role()
+        return ctx.user
     
     return role_checker
 
 
 def require_patient_access(patient_id: str):
     """Require access to specific patient data"""
-    async def patient_access_checker(current_user: User = Depends(get_current_user)) -> User:
+    async def patient_access_checker(ctx: AuthContext = Depends(auth_context)) -> User:
+        current_user = ctx.user
         # Patients can only access their own data
         if current_user.role == UserRole.PATIENT and current_user.patient_id != patient_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to patient data"
-            )
+            raise _forbidden_patient()
         
         # Clinicians and admins can access any patient data
-        if current_user.role not in [UserRole.PATIENT, UserRole.CLINICIAN, UserRole.ADMIN]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Insufficient permissions"
-            )
+        if current_user.role not in _PATIENT_DATA_ROLES:
+            raise _forbidden_role()
         
         return current_user
     
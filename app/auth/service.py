@@ -1,8 +1,18 @@
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, Set, List
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
+import base64
+import binascii
+import calendar
 import hashlib
+import heapq
+import hmac
 import secrets
 import json
+import time
+import orjson
 from pathlib import Path
 
 try:
@@ -17,31 +27,119 @@ from ..models.auth import (
     UserRole, UserStatus, AuthToken, TokenPayload, SecurityEvent
 )
 from ..logging.audit import security_audit_log
+from .session_store import SessionStore
+from .user_repository import UserRepository
+
+SESSION_CLEANUP_INTERVAL = 300  # seconds between expired-session sweeps
+MAX_VERIFIED_PASSWORDS = 1024  # successful bcrypt checks remembered per process
+MAX_CACHED_USERS = 10000  # users kept in memory in front of a user repository
+
+# bcrypt hash of a random, discarded password, so no login can ever match it
+_DUMMY_PASSWORD_HASH = "$2b$12$DhxNAfKy1tFv8SjYvqvaCu0TuGxZF/XacJ53QrDg4XJzXwRxDhgc2"
+
+
+_HS256_HEADER = base64.urlsafe_b64encode(orjson.dumps({"alg": "HS256", "typ": "JWT"})).rstrip(b"=")
+
+
+def _b64url_decode(segment: str) -> bytes:
+    """Strictly decode an unpadded base64url JWT segment"""
+    return base64.b64decode(segment + "=" * (-len(segment) % 4), altchars=b"-_", validate=True)
+
+
+def _encode_hs256(payload: Dict[str, Any], secret_key: str) -> str:
+    """Sign a JWT with HS256 directly (what jwt.encode does, minus its generality)"""
+    signing_input = _HS256_HEADER + b"." + base64.urlsafe_b64encode(orjson.dumps(payload)).rstrip(b"=")
+    signature = hmac.new(secret_key.encode(), signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + base64.urlsafe_b64encode(signature).rstrip(b"=")).decode()
+
+
+def _decode_hs256(token: str, secret_key: str) -> Dict[str, Any]:
+    """Verify an HS256 JWT and return its payload (expiry is left to the caller)"""
+    try:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        if orjson.loads(_b64url_decode(header_segment)).get("alg") != "HS256":
+            raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+        
+        signing_input = f"{header_segment}.{payload_segment}".encode("ascii")
+        expected = hmac.new(secret_key.encode(), signing_input, hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature_segment)):
+            raise jwt.InvalidSignatureError("Signature verification failed")
+        
+        payload = orjson.loads(_b64url_decode(payload_segment))
+    except (ValueError, AttributeError, binascii.Error) as e:
+        raise jwt.DecodeError(f"Invalid token: {e}")
+    
+    if not isinstance(payload, dict) or not all(
+        isinstance(payload.get(claim), (int, float)) for claim in ("exp", "iat")
+    ):
+        raise jwt.DecodeError("Token must carry numeric exp and iat claims")
+    return payload
+
+
+@lru_cache(maxsize=4096)
+def _decode_token(token: str, secret_key: str, algorithm: str) -> Optional[Tuple[str, str, str, float, float]]:
+    """Verify a JWT once and memoize its claims as (user_id, session_id, role, exp, iat)"""
+    try:
+        if algorithm == "HS256":
+            payload = _decode_hs256(token, secret_key)
+        else:
+            payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+        return (
+            payload["user_id"],
+            payload["session_id"],
+            payload["role"],
+            payload["exp"],
+            payload["iat"]
+        )
+    except (jwt.InvalidTokenError, KeyError):
+        return None
 
 
 class AuthenticationService:
     """Service for handling user authentication and session management"""
     
-    def __init__(self, secret_key: str = None):
+    def __init__(
+        self,
+        secret_key: str = None,
+        session_store: Optional[SessionStore] = None,
+        user_repository: Optional[UserRepository] = None
+    ):
         self.secret_key = secret_key or "your-secret-key-change-in-production"
+        # Shared store for multi-worker deployments; sessions stay local without one
+        self.session_store = session_store
+        # Persistent user storage; without one users only live in memory
+        self.user_repository = user_repository
         self.algorithm = "HS256"
         self.password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        # Verified against for unknown emails so those logins take as long as real ones
+        self._dummy_hash = _DUMMY_PASSWORD_HASH
+        
+        # Successful verifications keyed by (hash, keyed digest of the password); the
+        # per-process HMAC key keeps the digests useless outside this process
+        self._verified_passwords: "OrderedDict[Tuple[str, bytes], None]" = OrderedDict()
+        self._verify_cache_key = secrets.token_bytes(32)
         
         # In-memory storage for development (use database in production)
-        self._users: Dict[str, User] = {}
+        # With a repository these act as a bounded cache of recently used users
+        self._users: "OrderedDict[str, User]" = OrderedDict()
         self._sessions: Dict[str, UserSession] = {}
+        self._sessions_by_user: Dict[str, Set[str]] = defaultdict(set)
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        self._cleanup_task: Optional[asyncio.Task] = None
+        # In-flight validations by token, shared by concurrent callers
+        self._inflight_validations: Dict[str, asyncio.Task] = {}
         self._email_to_user_id: Dict[str, str] = {}
         
         # Load sample users
         self._load_sample_users()
     
     def _load_sample_users(self):
-        """Load sample users for development"""
+        """Load sample users for development (hashes precomputed to keep startup fast)"""
         sample_users = [
             {
                 "user_id": "user_6f6f76a7-e502-474f-af36-48aca5cec7f3",
                 "email": "jerry.clark@email.com",
-                "password": "password123",
+                "hashed_password": "$2b$12$Qhh16EgSxT3L5/8XKI/Rw.mM1KLw4k1UYoqELRFxhfssNkIFRKqdS",  # password123
                 "first_name": "Jerry",
                 "last_name": "Clark",
                 "role": UserRole.PATIENT,
@@ -52,7 +150,7 @@ class AuthenticationService:
             {
                 "user_id": "user_f8f82d73-28ff-488e-b649-625ecbe7c577",
                 "email": "tina.hall@email.com", 
-                "password": "password123",
+                "hashed_password": "$2b$12$Qhh16EgSxT3L5/8XKI/Rw.mM1KLw4k1UYoqELRFxhfssNkIFRKqdS",  # password123
                 "first_name": "Tina",
                 "last_name": "Hall",
                 "role": UserRole.PATIENT,
@@ -62,7 +160,7 @@ class AuthenticationService:
             {
                 "user_id": "user_clinician_1",
                 "email": "dr.garcia@hospital.com",
-                "password": "doctor123",
+                "hashed_password": "$2b$12$WZK6xI1P5ORyCkErwpdJweRlwZRjzR35QTvTm3ozS62fYq2lw5bPC",  # doctor123
                 "first_name": "Maria",
                 "last_name": "Garcia",
                 "role": UserRole.CLINICIAN
@@ -70,7 +168,7 @@ class AuthenticationService:
             {
                 "user_id": "user_admin_1",
                 "email": "admin@hospital.com",
-                "password": "admin123",
+                "hashed_password": "$2b$12$cyJdzgxSUvF1j5qgkYZkPuf09ISuHBWz5p71aXIzXkSXEVbitlf8K",  # admin123
                 "first_name": "System",
                 "last_name": "Administrator",
                 "role": UserRole.ADMIN
@@ -78,23 +176,77 @@ class AuthenticationService:
         ]
         
         for user_data in sample_users:
-            password = user_data.pop("password")
+            # Keep persisted sample users (and any password changes) across restarts
+            if self.user_repository is not None and self.user_repository.get(user_data["user_id"]):
+                continue
             user = User(
                 **user_data,
-                hashed_password=self._hash_password(password),
                 email_verified=True,
                 status=UserStatus.ACTIVE
             )
-            self._users[user.user_id] = user
-            self._email_to_user_id[user.email] = user.user_id
+            if self.user_repository is not None:
+                self.user_repository.add(user)
+            self._cache_user(user)
     
-    def _hash_password(self, password: str) -> str:
-        """Hash a password using bcrypt"""
-        return self.password_context.hash(password)
+    def _cache_user(self, user: User) -> None:
+        """Keep a user in memory, evicting the least recently used beyond MAX_CACHED_USERS"""
+        self._users[user.user_id] = user
+        self._users.move_to_end(user.user_id)
+        self._email_to_user_id[user.email] = user.user_id
+        # Only users that are also persisted can be evicted
+        if self.user_repository is not None and len(self._users) > MAX_CACHED_USERS:
+            _, evicted = self._users.popitem(last=False)
+            self._email_to_user_id.pop(evicted.email, None)
     
-    def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
-        return self.password_context.verify(plain_password, hashed_password)
+    def _get_user(self, user_id: str) -> Optional[User]:
+        """Look up a user in memory, falling back to the repository"""
+        user = self._users.get(user_id)
+        if user is not None:
+            self._users.move_to_end(user_id)
+            return user
+        if self.user_repository is None:
+            return None
+        user = self.user_repository.get(user_id)
+        if user is not None:
+            self._cache_user(user)
+        return user
+    
+    def _get_user_by_email(self, email: str) -> Optional[User]:
+        """Look up a user by email in memory, falling back to the repository"""
+        user_id = self._email_to_user_id.get(email)
+        if user_id:
+            return self._get_user(user_id)
+        if self.user_repository is None:
+            return None
+        user = self.user_repository.get_by_email(email)
+        if user is not None:
+            self._cache_user(user)
+        return user
+    
+    def _save_user(self, user: User) -> None:
+        """Persist changes to a user when a repository is configured"""
+        if self.user_repository is not None:
+            self.user_repository.save(user)
+    
+    async def _hash_password(self, password: str) -> str:
+        """Hash a password using bcrypt (in a worker thread, off the event loop)"""
+        return await asyncio.to_thread(self.password_context.hash, password)
+    
+    async def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash (in a worker thread, off the event loop)"""
+        digest = hmac.new(self._verify_cache_key, plain_password.encode(), hashlib.sha256).digest()
+        key = (hashed_password, digest)
+        if key in self._verified_passwords:
+            self._verified_passwords.move_to_end(key)
+            return True
+        
+        verified = await asyncio.to_thread(self.password_context.verify, plain_password, hashed_password)
+        # Only successes are remembered, so every wrong guess still pays for bcrypt
+        if verified:
+            self._verified_passwords[key] = None
+            if len(self._verified_passwords) > MAX_VERIFIED_PASSWORDS:
+                self._verified_passwords.popitem(last=False)
+        return verified
     
     def _generate_token(self, user: User, session: UserSession) -> str:
         """Generate JWT access token"""
@@ -105,53 +257,67 @@ class AuthenticationService:
             "exp": session.expires_at,
             "iat": datetime.utcnow()
         }
-        return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+        if self.algorithm != "HS256":
+            return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+        
+        # Same integer claims PyJWT would write
+        for claim in ("exp", "iat"):
+            payload[claim] = calendar.timegm(payload[claim].utctimetuple())
+        return _encode_hs256(payload, self.secret_key)
+    
+    def _verify_claims(self, token: str) -> Optional[Tuple[str, str, str, float, float]]:
+        """Verify a JWT and return its raw claims, comparing expiry as epoch seconds"""
+        claims = _decode_token(token, self.secret_key, self.algorithm)
+        # Cached claims outlive the token, so re-check expiry on every hit
+        if not claims or claims[3] <= time.time():
+            return None
+        return claims
     
     def _verify_token(self, token: str) -> Optional[TokenPayload]:
         """Verify and decode JWT token"""
-        try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return TokenPayload(
-                user_id=payload["user_id"],
-                session_id=payload["session_id"],
-                role=UserRole(payload["role"]),
-                exp=datetime.fromtimestamp(payload["exp"]),
-                iat=datetime.fromtimestamp(payload["iat"])
-            )
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.JWTError:
+        claims = self._verify_claims(token)
+        if not claims:
             return None
+        
+        user_id, session_id, role, exp, iat = claims
+        return TokenPayload(
+            user_id=user_id,
+            session_id=session_id,
+            role=UserRole(role),
+            exp=datetime.fromtimestamp(exp),
+            iat=datetime.fromtimestamp(iat)
+        )
     
     async def authenticate_user(self, email: str, password: str, ip_address: str = None) -> Optional[User]:
         """Authenticate user with email and password"""
-        user_id = self._email_to_user_id.get(email)
-        if not user_id:
+        user = self._get_user_by_email(email)
+        if not user:
+            await self._verify_password(password, self._dummy_hash)
             await security_audit_log(
                 event_type="login_attempt",
                 severity="warning",
-                description=f"Login attempt with non-existent email: {email}",
+                description="Login attempt with non-existent email: {email}",
+                email=email,
                 ip_address=ip_address
             )
             return None
         
-        user = self._users.get(user_id)
-        if not user:
-            return None
-        
-        # Check if account is locked
+        # Check if account is locked (still paying for a bcrypt check, so locked
+        # accounts can't be told apart from wrong passwords by timing)
         if user.account_locked_until and datetime.utcnow() < user.account_locked_until:
+            await self._verify_password(password, self._dummy_hash)
             await security_audit_log(
                 event_type="login_locked_account",
                 severity="warning", 
-                description=f"Login attempt on locked account: {email}",
+                description="Login attempt on locked account: {email}",
+                email=email,
                 user_id=user.user_id,
                 ip_address=ip_address
             )
             return None
         
         # Verify password
-        if not self._verify_password(password, user.hashed_password):
+        if not await self._verify_password(password, user.hashed_password):
             user.failed_login_attempts += 1
             
             # Lock account after 5 failed attempts
@@ -160,15 +326,18 @@ class AuthenticationService:
                 await security_audit_log(
                     event_type="account_locked",
                     severity="high",
-                    description=f"Account locked due to failed login attempts: {email}",
+                    description="Account locked due to failed login attempts: {email}",
+                    email=email,
                     user_id=user.user_id,
                     ip_address=ip_address
                 )
+            self._save_user(user)
             
             await security_audit_log(
                 event_type="login_failed",
                 severity="warning",
-                description=f"Failed login attempt for: {email}",
+                description="Failed login attempt for: {email}",
+                email=email,
                 user_id=user.user_id,
                 ip_address=ip_address
             )
@@ -178,11 +347,13 @@ class AuthenticationService:
         user.failed_login_attempts = 0
         user.account_locked_until = None
         user.last_login = datetime.utcnow()
+        self._save_user(user)
         
         await security_audit_log(
             event_type="login_success",
             severity="info",
-            description=f"Successful login: {email}",
+            description="Successful login: {email}",
+            email=email,
             user_id=user.user_id,
             ip_address=ip_address
         )
@@ -205,6 +376,10 @@ class AuthenticationService:
         )
         
         self._sessions[session.session_id] = session
+        self._sessions_by_user[user.user_id].add(session.session_id)
+        heapq.heappush(self._expiry_heap, (session.expires_at, session.session_id))
+        if self.session_store is not None:
+            await self.session_store.save(session)
         
         # Generate access token
         access_token = self._generate_token(user, session)
@@ -230,7 +405,7 @@ class AuthenticationService:
     
     async def logout(self, session_id: str, user_id: str = None) -> bool:
         """Handle user logout"""
-        session = self._sessions.get(session_id)
+        session = await self._get_session(session_id)
         if not session:
             return False
         
@@ -238,12 +413,12 @@ class AuthenticationService:
             return False
         
         # Deactivate session
-        session.is_active = False
+        await self._deactivate_session(session)
         
         await security_audit_log(
             event_type="logout",
             severity="info",
-            description=f"User logged out",
+            description="User logged out",
             user_id=session.user_id
         )
         
@@ -251,44 +426,87 @@ class AuthenticationService:
     
     async def logout_all_sessions(self, user_id: str) -> int:
         """Logout user from all sessions"""
+        session_ids = set(self._sessions_by_user.get(user_id, ()))
+        if self.session_store is not None:
+            session_ids |= await self.session_store.session_ids_for_user(user_id)
+        
         count = 0
-        for session in self._sessions.values():
-            if session.user_id == user_id and session.is_active:
-                session.is_active = False
+        for session_id in session_ids:
+            session = await self._get_session(session_id)
+            if session and session.is_active:
+                await self._deactivate_session(session)
                 count += 1
         
         await security_audit_log(
             event_type="logout_all_sessions",
             severity="info",
-            description=f"User logged out from all sessions",
+            description="User logged out from all sessions",
             user_id=user_id
         )
         
         return count
     
+    async def _get_session(self, session_id: str) -> Optional[UserSession]:
+        """Look up a session, from the shared store when one is configured"""
+        if self.session_store is None:
+            return self._sessions.get(session_id)
+        return await self.session_store.get(session_id)
+    
+    async def _deactivate_session(self, session: UserSession) -> None:
+        """Mark a session inactive here and remove it from the shared store"""
+        session.is_active = False
+        local = self._sessions.get(session.session_id)
+        if local is not None:
+            local.is_active = False
+        self._forget_session(session)
+        if self.session_store is not None:
+            await self.session_store.delete(session)
+    
+    def _forget_session(self, session: UserSession) -> None:
+        """Drop a session from the per-user index"""
+        session_ids = self._sessions_by_user.get(session.user_id)
+        if session_ids is not None:
+            session_ids.discard(session.session_id)
+            if not session_ids:
+                del self._sessions_by_user[session.user_id]
+    
     async def validate_session(self, token: str) -> Optional[Tuple[User, UserSession]]:
         """Validate session token and return user and session"""
-        token_payload = self._verify_token(token)
-        if not token_payload:
+        # Concurrent requests with the same token share one validation; the shield
+        # keeps one caller's cancellation from cancelling it for the others
+        task = self._inflight_validations.get(token)
+        if task is None:
+            task = asyncio.ensure_future(self._validate_session(token))
+            self._inflight_validations[token] = task
+            task.add_done_callback(lambda _: self._inflight_validations.pop(token, None))
+        return await asyncio.shield(task)
+    
+    async def _validate_session(self, token: str) -> Optional[Tuple[User, UserSession]]:
+        """Validate a session token (called once per in-flight token)"""
+        # Raw claims are enough here; skip building a TokenPayload and its datetimes
+        claims = self._verify_claims(token)
+        if not claims:
             return None
+        user_id, session_id = claims[0], claims[1]
         
-        session = self._sessions.get(token_payload.session_id)
-        if not session or not session.is_active or session.is_expired():
+        session = await self._get_session(session_id)
+        now = datetime.utcnow()
+        if not session or not session.is_active or now > session.expires_at:
             return None
         
-        user = self._users.get(token_payload.user_id)
+        user = self._get_user(user_id)
         if not user or user.status != UserStatus.ACTIVE:
             return None
         
         # Update last activity
-        session.last_activity = datetime.utcnow()
+        session.last_activity = now
         
         return user, session
     
     async def register_user(self, register_request: RegisterRequest) -> Optional[User]:
         """Register a new patient user"""
         # Check if email already exists
-        if register_request.email in self._email_to_user_id:
+        if self._get_user_by_email(register_request.email) is not None:
             return None
         
         # Validate password confirmation
@@ -304,7 +522,7 @@ class AuthenticationService:
         user = User(
             user_id=user_id,
             email=register_request.email,
-            hashed_password=self._hash_password(register_request.password),
+            hashed_password=await self._hash_password(register_request.password),
             first_name=register_request.first_name,
             last_name=register_request.last_name,
             role=UserRole.PATIENT,
@@ -315,13 +533,15 @@ class AuthenticationService:
             status=UserStatus.PENDING  # Email verification required
         )
         
-        self._users[user_id] = user
-        self._email_to_user_id[register_request.email] = user_id
+        if self.user_repository is not None and not self.user_repository.add(user):
+            return None
+        self._cache_user(user)
         
         await security_audit_log(
             event_type="user_registered",
             severity="info",
-            description=f"New user registered: {register_request.email}",
+            description="New user registered: {email}",
+            email=register_request.email,
             user_id=user_id
         )
         
@@ -329,16 +549,15 @@ class AuthenticationService:
     
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
-        return self._users.get(user_id)
+        return self._get_user(user_id)
     
     async def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
-        user_id = self._email_to_user_id.get(email)
-        return self._users.get(user_id) if user_id else None
+        return self._get_user_by_email(email)
     
     async def update_user_profile(self, user_id: str, updates: Dict[str, Any]) -> Optional[User]:
         """Update user profile"""
-        user = self._users.get(user_id)
+        user = self._get_user(user_id)
         if not user:
             return None
         
@@ -351,16 +570,17 @@ class AuthenticationService:
         for field, value in updates.items():
             if field in allowed_fields and hasattr(user, field):
                 setattr(user, field, value)
+        self._save_user(user)
         
         return user
     
     async def change_password(self, user_id: str, current_password: str, new_password: str) -> bool:
         """Change user password"""
-        user = self._users.get(user_id)
+        user = self._get_user(user_id)
         if not user:
             return False
         
-        if not self._verify_password(current_password, user.hashed_password):
+        if not await self._verify_password(current_password, user.hashed_password):
             await security_audit_log(
                 event_type="password_change_failed",
                 severity="warning",
@@ -369,7 +589,8 @@ class AuthenticationService:
             )
             return False
         
-        user.hashed_password = self._hash_password(new_password)
+        user.hashed_password = await self._hash_password(new_password)
+        self._save_user(user)
         
         await security_audit_log(
             event_type="password_changed",
@@ -382,12 +603,43 @@ class AuthenticationService:
     
     async def cleanup_expired_sessions(self) -> int:
         """Clean up expired sessions"""
-        expired_sessions = []
-        for session_id, session in self._sessions.items():
-            if session.is_expired():
-                expired_sessions.append(session_id)
-        
-        for session_id in expired_sessions:
+        now = datetime.utcnow()
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] < now:
+            _, session_id = heapq.heappop(self._expiry_heap)
+            session = self._sessions.get(session_id)
+            if session is None:
+                continue
+            
+            # Refreshed sessions go back on the heap with their new expiry
+            if not session.is_expired():
+                heapq.heappush(self._expiry_heap, (session.expires_at, session_id))
+                continue
+            
             del self._sessions[session_id]
+            self._forget_session(session)
+            removed += 1
         
-        return len(expired_sessions)
\ No newline at end of file
+        return removed
+    
+    async def _cleanup_loop(self, interval: float) -> None:
+        """Periodically remove expired sessions"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.cleanup_expired_sessions()
+    
+    def start_cleanup(self, interval: float = SESSION_CLEANUP_INTERVAL) -> None:
+        """Start the expired-session sweep on the running event loop"""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop(interval))
+    
+    async def stop_cleanup(self) -> None:
+        """Stop the expired-session sweep"""
+        if self._cleanup_task is None:
+            return
+        self._cleanup_task.cancel()
+        try:
+            await self._cleanup_task
+        except asyncio.CancelledError:
+            pass
+        self._cleanup_task = None
\ No newline at end of file
@@ -0,0 +1,63 @@
+from typing import Optional, Set
+from datetime import datetime
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+from ..models.auth import UserSession
+
+
+class SessionStore:
+    """Redis-backed session storage shared by every worker process"""
+    
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("The redis package is required for Redis session storage")
+        self._redis = redis.from_url(url)
+    
+    @staticmethod
+    def _session_key(session_id: str) -> str:
+        return f"auth:session:{session_id}"
+    
+    @staticmethod
+    def _user_key(user_id: str) -> str:
+        return f"auth:user_sessions:{user_id}"
+    
+    async def save(self, session: UserSession) -> None:
+        """Store a session until it expires (Redis drops it after that)"""
+        ttl = int((session.expires_at - datetime.utcnow()).total_seconds())
+        if ttl <= 0:
+            await self.delete(session)
+            return
+        
+        user_key = self._user_key(session.user_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.setex(self._session_key(session.session_id), ttl, session.model_dump_json())
+            pipe.sadd(user_key, session.session_id)
+            # Keep the user's index around as long as their longest-lived session
+            pipe.expire(user_key, ttl, nx=True)
+            pipe.expire(user_key, ttl, gt=True)
+            await pipe.execute()
+    
+    async def get(self, session_id: str) -> Optional[UserSession]:
+        """Fetch a live session, or None if it was deleted or has expired"""
+        raw = await self._redis.get(self._session_key(session_id))
+        return UserSession.model_validate_json(raw) if raw else None
+    
+    async def delete(self, session: UserSession) -> None:
+        """Remove a session so no worker accepts it any more"""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.delete(self._session_key(session.session_id))
+            pipe.srem(self._user_key(session.user_id), session.session_id)
+            await pipe.execute()
+    
+    async def session_ids_for_user(self, user_id: str) -> Set[str]:
+        """IDs of the sessions recorded for a user (some may have expired)"""
+        members = await self._redis.smembers(self._user_key(user_id))
+        return {member.decode() for member in members}
+    
+    async def close(self) -> None:
+        """Close the Redis connection pool"""
+        await self._redis.aclose()
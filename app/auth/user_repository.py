@@ -0,0 +1,53 @@
+from typing import Optional
+import sqlite3
+
+from ..models.auth import User
+
+
+class UserRepository:
+    """SQLite-backed user storage (sqlite3 reuses the prepared statements per connection)"""
+    
+    # Constant SQL text, so each statement is prepared once and then served from the cache
+    _CREATE_TABLE = (
+        "CREATE TABLE IF NOT EXISTS users ("
+        "user_id TEXT PRIMARY KEY, email TEXT UNIQUE NOT NULL, data TEXT NOT NULL)"
+    )
+    _GET_BY_ID = "SELECT data FROM users WHERE user_id = ?"
+    _GET_BY_EMAIL = "SELECT data FROM users WHERE email = ?"
+    _INSERT = "INSERT OR IGNORE INTO users (user_id, email, data) VALUES (?, ?, ?)"
+    _UPSERT = (
+        "INSERT INTO users (user_id, email, data) VALUES (?, ?, ?) "
+        "ON CONFLICT(user_id) DO UPDATE SET email = excluded.email, data = excluded.data"
+    )
+    
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(self._CREATE_TABLE)
+    
+    def _fetch(self, sql: str, key: str) -> Optional[User]:
+        row = self._conn.execute(sql, (key,)).fetchone()
+        return User.model_validate_json(row[0]) if row else None
+    
+    def get(self, user_id: str) -> Optional[User]:
+        """Load a user by ID"""
+        return self._fetch(self._GET_BY_ID, user_id)
+    
+    def get_by_email(self, email: str) -> Optional[User]:
+        """Load a user by email address"""
+        return self._fetch(self._GET_BY_EMAIL, email)
+    
+    def add(self, user: User) -> bool:
+        """Insert a user unless the ID or email is already taken"""
+        with self._conn:
+            cursor = self._conn.execute(self._INSERT, (user.user_id, user.email, user.model_dump_json()))
+        return cursor.rowcount == 1
+    
+    def save(self, user: User) -> None:
+        """Insert or update a user"""
+        with self._conn:
+            self._conn.execute(self._UPSERT, (user.user_id, user.email, user.model_dump_json()))
+    
+    def close(self) -> None:
+        """Close the database connection"""
+        self._conn.close()
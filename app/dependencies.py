@@ -1,8 +1,9 @@
-from functools import lru_cache
 from typing import Optional, Annotated
+import asyncio
 import os
-from pydantic_settings import BaseSettings
-from fastapi import Depends
+import threading
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from fastapi import Depends, Request
 
 from app.llm.client import LLMClient
 from app.ehr.client import EHRClient
@@ -10,6 +11,11 @@ from app.retrieval.vector_store import VectorStore
 from app.intake.service import IntakeService
 from app.review.service import ReviewService
 from app.llm.orchestrator import CarePlanOrchestrator
+from app.logging import get_logger
+
+logger = get_logger(__name__)
+
+WARM_UP_TIMEOUT = 5.0  # seconds per warm-up step
 
 
 class Settings(BaseSettings):
@@ -23,6 +29,7 @@ class Settings(BaseSettings):
     # OpenAI Configuration
     openai_api_key: str
     openai_model: str = "gpt-4-turbo-preview"
+    openai_embedding_model: str = "text-embedding-3-small"
     
     # EHR Integration
     ehr_api_url: str = "http://localhost:8080"
@@ -34,89 +41,171 @@ class Settings(BaseSettings):
     # Vector Store Configuration
     vector_store_path: str = "/app/data/vector_store"
     vector_dimension: int = 1536
+    vector_index_type: str = "hnsw"  # flat (exact), ivf, hnsw, sq8 (int8) or ivfpq (product-quantized)
     
     # Logging Configuration
     log_level: str = "INFO"
     
-    class Config:
-        env_file = ".env"
-        extra = "allow"  # Allow extra fields from environment
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="allow"  # Allow extra fields from environment
+    )
 
 
-# Global instances to avoid recreating services on each request
-_llm_client: Optional[LLMClient] = None
-_ehr_client: Optional[EHRClient] = None
-_vector_store: Optional[VectorStore] = None
-_intake_service: Optional[IntakeService] = None
-_review_service: Optional[ReviewService] = None
-_orchestrator: Optional[CarePlanOrchestrator] = None
+# Parsed once on first use; importing the app must not require the environment to be set
+settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
 
 
-@lru_cache()
 def get_settings() -> Settings:
-    """Get cached application settings."""
-    return Settings()
+    """Get the application settings singleton."""
+    global settings
+    if settings is None:
+        with _settings_lock:
+            if settings is None:
+                settings = Settings()
+    return settings
 
 
-def get_llm_client() -> LLMClient:
-    """Get LLM client dependency."""
-    global _llm_client
-    if _llm_client is None:
-        settings = get_settings()
-        _llm_client = LLMClient(
-            api_key=settings.openai_api_key,
-            model=settings.openai_model
+class ServiceContainer:
+    """Long-lived services for one application, built on first use and kept on app.state"""
+    
+    def __init__(self):
+        self._llm_client: Optional[LLMClient] = None
+        self._ehr_client: Optional[EHRClient] = None
+        self._vector_store: Optional[VectorStore] = None
+        self._intake_service: Optional[IntakeService] = None
+        self._review_service: Optional[ReviewService] = None
+        self._orchestrator: Optional[CarePlanOrchestrator] = None
+    
+    @property
+    def llm_client(self) -> LLMClient:
+        if self._llm_client is None:
+            settings = get_settings()
+            self._llm_client = LLMClient(
+                api_key=settings.openai_api_key,
+                model=settings.openai_model,
+                embedding_model=settings.openai_embedding_model
+            )
+        return self._llm_client
+    
+    @property
+    def ehr_client(self) -> EHRClient:
+        if self._ehr_client is None:
+            settings = get_settings()
+            self._ehr_client = EHRClient(
+                base_url=settings.ehr_api_url,
+                api_key=settings.ehr_api_key
+            )
+        return self._ehr_client
+    
+    @property
+    def vector_store(self) -> VectorStore:
+        if self._vector_store is None:
+            settings = get_settings()
+            self._vector_store = VectorStore(
+                dimension=settings.vector_dimension,
+                index_type=settings.vector_index_type
+            )
+        return self._vector_store
+    
+    @property
+    def intake_service(self) -> IntakeService:
+        if self._intake_service is None:
+            self._intake_service = IntakeService()
+        return self._intake_service
+    
+    @property
+    def review_service(self) -> ReviewService:
+        if self._review_service is None:
+            self._review_service = ReviewService()
+        return self._review_service
+    
+    @property
+    def orchestrator(self) -> CarePlanOrchestrator:
+        if self._orchestrator is None:
+            self._orchestrator = CarePlanOrchestrator(
+                llm_client=self.llm_client,
+                ehr_client=self.ehr_client,
+                vector_store=self.vector_store
+            )
+        return self._orchestrator
+    
+    async def warm_up(self) -> None:
+        """Open the EHR and OpenAI connections and load the sample data ahead of the first request."""
+        try:
+            ehr_client, llm_client = self.ehr_client, self.llm_client
+        except Exception as e:
+            logger.warning("Service warm-up skipped", error=str(e))
+            return
+        
+        steps = {
+            "ehr": ehr_client.client.head("/health"),
+            "openai": llm_client.client.with_options(max_retries=0).models.list(),
+            "intake_sample_data": asyncio.to_thread(self.intake_service._load_sample_data),
+            "careplan_sample_data": asyncio.to_thread(self.orchestrator._load_sample_data),
+        }
+        results = await asyncio.gather(
+            *(asyncio.wait_for(step, WARM_UP_TIMEOUT) for step in steps.values()),
+            return_exceptions=True
         )
-    return _llm_client
+        for name, result in zip(steps, results):
+            if isinstance(result, Exception):
+                # Startup must not depend on the EHR or OpenAI being reachable
+                logger.warning("Service warm-up step failed", step=name, error=repr(result))
+    
+    async def close(self) -> None:
+        """Close the shared HTTP client pools (called on application shutdown)."""
+        if self._ehr_client is not None:
+            await self._ehr_client.close()
+            self._ehr_client = None
+        if self._llm_client is not None:
+            await self._llm_client.close()
+            self._llm_client = None
+        self._orchestrator = None
+
+
+def get_services(request: Request) -> ServiceContainer:
+    """Get the service container of the application serving the request."""
+    state = request.app.state
+    services = getattr(state, "services", None)
+    if services is None:
+        # Apps that never set one up (e.g. a bare router in tests) get their own
+        services = state.services = ServiceContainer()
+    return services
+
+
+ServicesDep = Annotated[ServiceContainer, Depends(get_services)]
 
 
-def get_ehr_client() -> EHRClient:
+def get_llm_client(services: ServicesDep) -> LLMClient:
+    """Get LLM client dependency."""
+    return services.llm_client
+
+
+def get_ehr_client(services: ServicesDep) -> EHRClient:
     """Get EHR client dependency."""
-    global _ehr_client
-    if _ehr_client is None:
-        settings = get_settings()
-        _ehr_client = EHRClient(
-            base_url=settings.ehr_api_url,
-            api_key=settings.ehr_api_key
-        )
-    return _ehr_client
+    return services.ehr_client
 
 
-def get_vector_store() -> VectorStore:
+def get_vector_store(services: ServicesDep) -> VectorStore:
     """Get vector store dependency."""
-    global _vector_store
-    if _vector_store is None:
-        settings = get_settings()
-        _vector_store = VectorStore(dimension=settings.vector_dimension)
-    return _vector_store
+    return services.vector_store
 
 
-def get_intake_service() -> IntakeService:
+def get_intake_service(services: ServicesDep) -> IntakeService:
     """Get intake service dependency."""
-    global _intake_service
-    if _intake_service is None:
-        _intake_service = IntakeService()
-    return _intake_service
+    return services.intake_service
 
 
-def get_review_service() -> ReviewService:
-    """Get review service dependency.""" 
-    global _review_service
-    if _review_service is None:
-        _review_service = ReviewService()
-    return _review_service
+def get_review_service(services: ServicesDep) -> ReviewService:
+    """Get review service dependency."""
+    return services.review_service
 
 
-def get_careplan_orchestrator() -> CarePlanOrchestrator:
+def get_careplan_orchestrator(services: ServicesDep) -> CarePlanOrchestrator:
     """Get care plan orchestrator dependency."""
-    global _orchestrator
-    if _orchestrator is None:
-        _orchestrator = CarePlanOrchestrator(
-            llm_client=get_llm_client(),
-            ehr_client=get_ehr_client(),
-            vector_store=get_vector_store()
-        )
-    return _orchestrator
+    return services.orchestrator
 
 
 # Type aliases for dependency injection
@@ -1,32 +1,72 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable, FrozenSet
+from collections import OrderedDict
 from datetime import datetime
+import asyncio
+import functools
+import time
 import httpx
 
 from ..models.ehr import EHRRecord, LabResult, VitalSigns, Diagnosis
 
+EHR_CACHE_TTL = 60  # seconds a fetched section is reused
+EHR_CACHE_MAXSIZE = 1024
+
+
+def _ttl_cached(fetch):
+    """Reuse a fetch's result per patient and arguments for EHR_CACHE_TTL seconds"""
+    @functools.wraps(fetch)
+    async def wrapper(self, patient_id: str, *args, **kwargs):
+        key = (fetch.__name__, patient_id, args, tuple(sorted(kwargs.items())))
+        return await self._cached(key, lambda: fetch(self, patient_id, *args, **kwargs))
+    return wrapper
+
 
 class EHRClient:
     """Client for fetching data from EHR systems (Epic, Cerner, etc.)"""
     
-    def __init__(self, base_url: str, api_key: str, timeout: int = 30):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout: int = 30,
+        max_connections: int = 50,
+        max_keepalive_connections: int = 10,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
         self.base_url = base_url
         self.api_key = api_key
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        # One pooled client shared by every request (keeps connections warm);
+        # an injected client stays owned, and closed, by the caller
+        self._owns_client = http_client is None
+        self.client = http_client or httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            )
+        )
+        # (fetch, patient_id, args) -> (expires_at, task), least recently used first
+        self._cache: "OrderedDict[Tuple, Tuple[float, asyncio.Future]]" = OrderedDict()
     
     async def get_patient_record(self, patient_id: str, mrn: Optional[str] = None) -> EHRRecord:
         """Fetch comprehensive patient record from EHR"""
         try:
             # Fetch different data types in parallel
-            patient_info = await self._fetch_patient_demographics(patient_id, mrn)
-            diagnoses = await self._fetch_diagnoses(patient_id)
-            lab_results = await self._fetch_lab_results(patient_id)
-            vital_signs = await self._fetch_vital_signs(patient_id)
-            procedures = await self._fetch_procedures(patient_id)
+            patient_info, diagnoses, lab_results, vital_signs, procedures = await asyncio.gather(
+                self._fetch_patient_demographics(patient_id, mrn),
+                self._fetch_diagnoses(patient_id),
+                self._fetch_lab_results(patient_id),
+                self._fetch_vital_signs(patient_id),
+                self._fetch_procedures(patient_id)
+            )
             
-            return EHRRecord(
+            # Every section is already a model built by this client, so skip re-validation
+            return EHRRecord.model_construct(
                 patient_id=patient_id,
-                record_id=f"ehr_{patient_id}_{int(datetime.utcnow().timestamp())}",
+                record_id=f"ehr_{patient_id}_{time.time_ns()}",
                 mrn=patient_info.get("mrn"),
                 date_of_birth=patient_info.get("date_of_birth"),
                 gender=patient_info.get("gender"),
@@ -49,13 +89,39 @@ class EHRClient:
     
     async def search_diagnoses(self, patient_id: str, icd_codes: List[str]) -> List[Diagnosis]:
         """Search for specific diagnoses by ICD codes"""
-        all_diagnoses = await self._fetch_diagnoses(patient_id)
-        filtered_diagnoses = [
-            dx for dx in all_diagnoses 
-            if dx.icd_10_code in icd_codes
-        ]
-        return filtered_diagnoses
+        return await self._fetch_diagnoses(patient_id, icd_filter=frozenset(icd_codes))
     
+    def invalidate_patient(self, patient_id: str) -> None:
+        """Drop cached EHR data for a patient (call after writing to their record)"""
+        for key in [key for key in self._cache if key[1] == patient_id]:
+            del self._cache[key]
+    
+    async def _cached(self, key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a live cached result for key, or start the fetch and share it"""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > now:
+            self._cache.move_to_end(key)
+            return await asyncio.shield(entry[1])
+        
+        # Caching the task rather than its result lets concurrent callers share one request
+        task = asyncio.ensure_future(fetch())
+        self._cache[key] = (now + EHR_CACHE_TTL, task)
+        self._cache.move_to_end(key)
+        if len(self._cache) > EHR_CACHE_MAXSIZE:
+            self._cache.popitem(last=False)
+        
+        def drop_failed(done: asyncio.Future) -> None:
+            if (done.cancelled() or done.exception() is not None) and self._cache.get(key, (0, None))[1] is done:
+                del self._cache[key]
+        task.add_done_callback(drop_failed)
+        
+        return await asyncio.shield(task)
+    
+    # The fetchers below build models with model_construct: their data comes from
+    # the EHR integration rather than API callers, so pydantic validation is skipped
+    
+    @_ttl_cached
     async def _fetch_patient_demographics(self, patient_id: str, mrn: Optional[str]) -> Dict[str, Any]:
         """Fetch patient demographic information"""
         # Placeholder for actual EHR API call
@@ -64,11 +130,7 @@ class EHRClient:
             params["mrn"] = mrn
             
         # Example API call structure
-        # response = await self.client.get(
-        #     f"{self.base_url}/patients/{patient_id}",
-        #     headers={"Authorization": f"Bearer {self.api_key}"},
-        #     params=params
-        # )
+        # response = await self.client.get(f"/patients/{patient_id}", params=params)
         
         # Mock response for now
         return {
@@ -77,12 +139,20 @@ class EHRClient:
             "gender": "F"
         }
     
-    async def _fetch_diagnoses(self, patient_id: str) -> List[Diagnosis]:
-        """Fetch patient diagnoses from EHR"""
-        # Placeholder for EHR API call
+    @_ttl_cached
+    async def _fetch_diagnoses(
+        self,
+        patient_id: str,
+        icd_filter: Optional[FrozenSet[str]] = None
+    ) -> List[Diagnosis]:
+        """Fetch patient diagnoses from EHR, optionally only those with the given ICD-10 codes"""
+        # Placeholder for EHR API call; the code filter is pushed down to the query
+        # params = {"icd_codes": ",".join(sorted(icd_filter))} if icd_filter is not None else None
+        # response = await self.client.get(f"/patients/{patient_id}/diagnoses", params=params)
+        
         # Mock data
-        return [
-            Diagnosis(
+        diagnoses = [
+            Diagnosis.model_construct(
                 icd_10_code="E11.9",
                 description="Type 2 diabetes mellitus without complications",
                 diagnosis_date=datetime(2023, 1, 15),
@@ -90,12 +160,16 @@ class EHRClient:
                 provider="Dr. Smith"
             )
         ]
+        if icd_filter is not None:
+            diagnoses = [dx for dx in diagnoses if dx.icd_10_code in icd_filter]
+        return diagnoses
     
+    @_ttl_cached
     async def _fetch_lab_results(self, patient_id: str, days_back: int = 30) -> List[LabResult]:
         """Fetch laboratory results"""
         # Placeholder for EHR API call
         return [
-            LabResult(
+            LabResult.model_construct(
                 test_name="HbA1c",
                 value="7.2",
                 unit="%",
@@ -105,11 +179,12 @@ class EHRClient:
             )
         ]
     
+    @_ttl_cached
     async def _fetch_vital_signs(self, patient_id: str, days_back: int = 7) -> List[VitalSigns]:
         """Fetch vital signs"""
         # Placeholder for EHR API call
         return [
-            VitalSigns(
+            VitalSigns.model_construct(
                 temperature_f=98.6,
                 blood_pressure_systolic=145,
                 blood_pressure_diastolic=92,
@@ -120,6 +195,7 @@ class EHRClient:
             )
         ]
     
+    @_ttl_cached
     async def _fetch_procedures(self, patient_id: str) -> List[Dict[str, Any]]:
         """Fetch procedures from EHR"""
         # Placeholder for EHR API call
@@ -127,4 +203,5 @@ class EHRClient:
     
     async def close(self):
         """Close the HTTP client"""
-        await self.client.aclose()
\ No newline at end of file
+        if self._owns_client:
+            await self.client.aclose()
\ No newline at end of file
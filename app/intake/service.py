@@ -1,33 +1,80 @@
 from typing import List, Dict, Any, Optional
-from datetime import datetime
-import json
+from datetime import datetime, timezone
+import asyncio
+import orjson
 import os
+import time
 from pathlib import Path
 
 from ..models.intake import PatientIntake
 
 
+def _intake_date_key(entry: Dict[str, Any]) -> datetime:
+    """Sort key for intake history: the intake date as an aware UTC datetime."""
+    try:
+        intake_date = datetime.fromisoformat(entry["intake_date"])
+    except (TypeError, ValueError):
+        return datetime.min.replace(tzinfo=timezone.utc)
+    if intake_date.tzinfo is None:
+        # Naive sample dates are recorded in UTC
+        intake_date = intake_date.replace(tzinfo=timezone.utc)
+    return intake_date
+
+
 class IntakeService:
     """Service for processing patient intake data"""
     
+    # Fields scored by validate_intake_completeness, in reporting order
+    _FIELD_CHECKS = (
+        ("chief_complaint", bool),
+        ("symptoms", bool),
+        ("medical_history", bool),
+        ("current_medications", bool),
+        ("allergies", bool),
+        ("age", lambda age: bool(age) and age > 0),
+        ("gender", bool),
+        ("family_history", bool),
+    )
+    
     def __init__(self):
         # Path to sample data
         self.sample_data_path = Path(__file__).parent.parent.parent / "scripts" / "seed_data" / "sample_data.json"
         self._intake_storage = {}  # In-memory storage for development
+        self._patient_index: Dict[str, List[str]] = {}  # patient_id -> intake_ids, oldest first
+        self._storage_lock = asyncio.Lock()  # Guards _intake_storage and _patient_index together
+        self._sample_data_cache: Optional[Dict[str, Any]] = None
+        self._sample_index: Dict[str, List[Dict[str, Any]]] = {}
     
     def _load_sample_data(self) -> Dict[str, Any]:
-        """Load sample data from JSON file."""
-        try:
-            if self.sample_data_path.exists():
-                with open(self.sample_data_path, 'r') as f:
-                    return json.load(f)
-            return {"intakes": [], "patients": []}
-        except Exception:
-            return {"intakes": [], "patients": []}
+        """Load sample data from JSON file (read and parsed once per service)."""
+        if self._sample_data_cache is None:
+            try:
+                if self.sample_data_path.exists():
+                    sample_data = orjson.loads(self.sample_data_path.read_bytes())
+                else:
+                    sample_data = {"intakes": [], "patients": []}
+            except Exception:
+                sample_data = {"intakes": [], "patients": []}
+            
+            sample_index: Dict[str, List[Dict[str, Any]]] = {}
+            for intake in sample_data.get("intakes", []):
+                sample_index.setdefault(intake.get("patient_id"), []).append(intake)
+            # Publish the index before the data: a loaded cache implies a built index
+            # (the startup warm-up runs this in a worker thread)
+            self._sample_index = sample_index
+            self._sample_data_cache = sample_data
+        return self._sample_data_cache
+    
+    def _sample_intakes_for(self, patient_id: str) -> List[Dict[str, Any]]:
+        """Sample intakes recorded for a patient."""
+        self._load_sample_data()
+        return self._sample_index.get(patient_id, [])
     
     async def process_intake(self, intake_data: PatientIntake) -> Dict[str, Any]:
         """Process and validate patient intake data"""
-        intake_id = f"intake_{intake_data.patient_id}_{int(datetime.utcnow().timestamp())}"
+        now = datetime.now(timezone.utc)
+        processed_at = now.isoformat()
+        intake_id = f"intake_{intake_data.patient_id}_{time.time_ns()}"
         
         # Validate required fields
         validation_result = await self._validate_intake_data(intake_data)
@@ -35,18 +82,21 @@ class IntakeService:
             raise ValueError(f"Invalid intake data: {validation_result['errors']}")
         
         # Store intake data in memory for development
-        self._intake_storage[intake_id] = {
-            "intake_id": intake_id,
-            "patient_id": intake_data.patient_id,
-            "intake_data": intake_data.dict(),
-            "processed_at": datetime.utcnow().isoformat(),
-            "validation_status": "passed"
-        }
+        async with self._storage_lock:
+            if intake_id not in self._intake_storage:
+                self._patient_index.setdefault(intake_data.patient_id, []).append(intake_id)
+            self._intake_storage[intake_id] = {
+                "intake_id": intake_id,
+                "patient_id": intake_data.patient_id,
+                "intake_data": intake_data,  # Kept as the model; dumped only when served
+                "processed_at": processed_at,
+                "validation_status": "passed"
+            }
         
         return {
             "intake_id": intake_id,
             "patient_id": intake_data.patient_id,
-            "processed_at": datetime.utcnow().isoformat(),
+            "processed_at": processed_at,
             "validation_status": "passed"
         }
     
@@ -54,18 +104,15 @@ class IntakeService:
         """Validate if intake data is complete enough for care plan generation"""
         # First check in-memory storage
         intake_data = None
-        for stored_intake in self._intake_storage.values():
-            if stored_intake["patient_id"] == patient_id:
-                intake_data = stored_intake["intake_data"]
-                break
+        stored_ids = self._patient_index.get(patient_id)
+        if stored_ids:
+            intake_data = self._intake_storage[stored_ids[0]]["intake_data"]
         
         # If not found in memory, check sample data
         if not intake_data:
-            sample_data = self._load_sample_data()
-            for intake in sample_data.get("intakes", []):
-                if intake.get("patient_id") == patient_id:
-                    intake_data = intake
-                    break
+            sample_intakes = self._sample_intakes_for(patient_id)
+            if sample_intakes:
+                intake_data = sample_intakes[0]
         
         if not intake_data:
             return {
@@ -74,52 +121,14 @@ class IntakeService:
                 "completeness_score": 0.0
             }
         
-        missing_fields = []
-        score = 0.0
-        total_fields = 8  # Updated count
-        
-        # Check essential fields
-        if not intake_data.get("chief_complaint"):
-            missing_fields.append("chief_complaint")
-        else:
-            score += 1
-            
-        if not intake_data.get("symptoms") or len(intake_data.get("symptoms", [])) == 0:
-            missing_fields.append("symptoms")
+        # Stored intakes are PatientIntake models, sample intakes are plain dicts
+        if isinstance(intake_data, dict):
+            get = intake_data.get
         else:
-            score += 1
-            
-        if not intake_data.get("medical_history") or len(intake_data.get("medical_history", [])) == 0:
-            missing_fields.append("medical_history")
-        else:
-            score += 1
-            
-        if not intake_data.get("current_medications"):
-            missing_fields.append("current_medications")
-        else:
-            score += 1
-            
-        if not intake_data.get("allergies"):
-            missing_fields.append("allergies")
-        else:
-            score += 1
-            
-        if not intake_data.get("age") or intake_data.get("age", 0) <= 0:
-            missing_fields.append("age")
-        else:
-            score += 1
-            
-        if not intake_data.get("gender"):
-            missing_fields.append("gender")
-        else:
-            score += 1
-            
-        if not intake_data.get("family_history"):
-            missing_fields.append("family_history")
-        else:
-            score += 1
-            
-        completeness_score = score / total_fields
+            get = lambda name, default=None: getattr(intake_data, name, default)
+        
+        missing_fields = [name for name, is_filled in self._FIELD_CHECKS if not is_filled(get(name))]
+        completeness_score = (len(self._FIELD_CHECKS) - len(missing_fields)) / len(self._FIELD_CHECKS)
         
         return {
             "is_complete": completeness_score >= 0.7,
@@ -133,27 +142,25 @@ class IntakeService:
         history = []
         
         # Get from in-memory storage
-        for stored_intake in self._intake_storage.values():
-            if stored_intake["patient_id"] == patient_id:
-                history.append({
-                    "intake_id": stored_intake["intake_id"],
-                    "intake_date": stored_intake["processed_at"],
-                    "chief_complaint": stored_intake["intake_data"].get("chief_complaint"),
-                    "completeness_score": 1.0  # Stored intakes are assumed complete
-                })
+        for intake_id in self._patient_index.get(patient_id, ()):
+            stored_intake = self._intake_storage[intake_id]
+            history.append({
+                "intake_id": stored_intake["intake_id"],
+                "intake_date": stored_intake["processed_at"],
+                "chief_complaint": stored_intake["intake_data"].chief_complaint,
+                "completeness_score": 1.0  # Stored intakes are assumed complete
+            })
         
         # Also get from sample data
-        sample_data = self._load_sample_data()
-        for intake in sample_data.get("intakes", []):
-            if intake.get("patient_id") == patient_id:
-                history.append({
-                    "intake_id": f"sample_{patient_id}",
-                    "intake_date": intake.get("intake_date", datetime.utcnow().isoformat()),
-                    "chief_complaint": intake.get("chief_complaint"),
-                    "completeness_score": 0.9
-                })
-        
-        return sorted(history, key=lambda x: x["intake_date"], reverse=True)
+        for intake in self._sample_intakes_for(patient_id):
+            history.append({
+                "intake_id": f"sample_{patient_id}",
+                "intake_date": intake.get("intake_date", datetime.utcnow().isoformat()),
+                "chief_complaint": intake.get("chief_complaint"),
+                "completeness_score": 0.9
+            })
+        
+        return sorted(history, key=_intake_date_key, reverse=True)
     
     async def _validate_intake_data(self, intake_data: PatientIntake) -> Dict[str, Any]:
         """Internal validation of intake data"""
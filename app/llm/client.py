@@ -1,20 +1,90 @@
 from typing import List, Dict, Any, Optional, AsyncGenerator
 import openai
 from openai import AsyncOpenAI
-import json
+import httpx
+import orjson
 import asyncio
 
 from ..models.intake import PatientIntake
 from ..models.ehr import EHRRecord
 from ..models.guideline import Guideline
+from ..logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _prompt_section(title: str, lines: List[str], always: bool = False) -> str:
+    """One titled block of the care plan prompt, or nothing when it has no lines"""
+    if not lines and not always:
+        return ""
+    return "\n".join([title, *lines]) + "\n\n"
 
 
 class LLMClient:
     """OpenAI GPT-4 client for care plan generation"""
     
-    def __init__(self, api_key: str, model: str = "gpt-4-turbo-preview"):
-        self.client = AsyncOpenAI(api_key=api_key)
+    _SYSTEM_PROMPT = """You are an expert clinical AI assistant specializing in personalized care plan generation.
+        
+        Your role is to:
+        1. Analyze patient intake data and medical history
+        2. Consider relevant clinical guidelines and evidence
+        3. Generate comprehensive, personalized care plans
+        4. Ensure all recommendations are evidence-based and safe
+        5. Include appropriate monitoring and follow-up instructions
+        
+        Always provide your response in structured JSON format with the following sections:
+        - primary_diagnosis
+        - secondary_diagnoses
+        - clinical_summary
+        - actions (with priority, timeline, and rationale)
+        - short_term_goals
+        - long_term_goals
+        - success_metrics
+        - patient_instructions
+        - educational_resources
+        
+        Remember: This is a draft for clinician review, not final medical advice."""
+    
+    _CARE_PLAN_PROMPT_TEMPLATE = (
+        "Generate a personalized care plan based on the following patient information:\n"
+        "\n"
+        "PATIENT INTAKE DATA:\n"
+        "Patient ID: {patient_id}\n"
+        "Age: {age}, Gender: {gender}\n"
+        "Chief Complaint: {chief_complaint}\n"
+        "\n"
+        "{symptoms}{history}{medications}{ehr}{guidelines}"
+        "Please generate a comprehensive care plan in JSON format."
+    )
+    
+    # Routes care plan requests, which all share the system prompt above as their
+    # prefix, to the same OpenAI prompt cache; bump it whenever that prompt changes
+    _PROMPT_CACHE_KEY = "careplan_v1"
+    
+    _VALIDATION_SYSTEM_PROMPT = """You are a medical safety validator. Review the care plan for:
+        1. Drug interactions and contraindications
+        2. Dosage appropriateness
+        3. Missing critical assessments
+        4. Safety concerns
+        
+        Return a validation report in JSON format."""
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4-turbo-preview",
+        http_client: Optional[httpx.AsyncClient] = None,
+        embedding_model: str = "text-embedding-3-small"
+    ):
+        # Bounded keep-alive pool instead of the SDK's default 1000 connections
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=http_client or openai.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        )
         self.model = model
+        self.embedding_model = embedding_model
         self.max_tokens = 4000
         self.temperature = 0.3  # Lower temperature for more consistent medical advice
     
@@ -26,24 +96,20 @@ class LLMClient:
     ) -> Dict[str, Any]:
         """Generate comprehensive care plan from patient data"""
         
-        system_prompt = self._build_system_prompt()
-        user_prompt = self._build_care_plan_prompt(
-            patient_intake, ehr_data, relevant_guidelines
-        )
+        messages = self._care_plan_messages(patient_intake, ehr_data, relevant_guidelines)
         
         try:
             response = await self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=messages,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                extra_body={"prompt_cache_key": self._PROMPT_CACHE_KEY}
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(response.choices[0].message.content)
+            self._log_prompt_cache_usage(response.usage)
             
             return {
                 "care_plan": result,
@@ -55,6 +121,34 @@ class LLMClient:
         except Exception as e:
             raise Exception(f"LLM generation failed: {str(e)}")
     
+    async def stream_care_plan(
+        self,
+        patient_intake: PatientIntake,
+        ehr_data: Optional[EHRRecord] = None,
+        relevant_guidelines: List[Guideline] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream the care plan JSON text as the model produces it"""
+        
+        messages = self._care_plan_messages(patient_intake, ehr_data, relevant_guidelines)
+        
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                response_format={"type": "json_object"},
+                extra_body={"prompt_cache_key": self._PROMPT_CACHE_KEY},
+                stream=True
+            )
+            
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            
+        except Exception as e:
+            raise Exception(f"LLM generation failed: {str(e)}")
+    
     async def regenerate_section(
         self,
         section_name: str,
@@ -68,7 +162,7 @@ class LLMClient:
         with the rest of the plan."""
         
         user_prompt = f"""
-        Current care plan: {json.dumps(existing_plan, indent=2)}
+        Current care plan: {orjson.dumps(existing_plan).decode()}
         
         Please regenerate only the '{section_name}' section.
         {f'Additional context: {additional_context}' if additional_context else ''}
@@ -88,7 +182,7 @@ class LLMClient:
                 response_format={"type": "json_object"}
             )
             
-            return json.loads(response.choices[0].message.content)
+            return orjson.loads(response.choices[0].message.content)
             
         except Exception as e:
             raise Exception(f"Section regeneration failed: {str(e)}")
@@ -96,21 +190,13 @@ class LLMClient:
     async def validate_care_plan(self, care_plan: Dict[str, Any]) -> Dict[str, Any]:
         """Validate care plan for safety and completeness"""
         
-        system_prompt = """You are a medical safety validator. Review the care plan for:
-        1. Drug interactions and contraindications
-        2. Dosage appropriateness
-        3. Missing critical assessments
-        4. Safety concerns
-        
-        Return a validation report in JSON format."""
-        
-        user_prompt = f"Care plan to validate: {json.dumps(care_plan, indent=2)}"
+        user_prompt = f"Care plan to validate: {orjson.dumps(care_plan).decode()}"
         
         try:
             response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": self._VALIDATION_SYSTEM_PROMPT},
                     {"role": "user", "content": user_prompt}
                 ],
                 max_tokens=1000,
@@ -118,34 +204,43 @@ class LLMClient:
                 response_format={"type": "json_object"}
             )
             
-            return json.loads(response.choices[0].message.content)
+            return orjson.loads(response.choices[0].message.content)
             
         except Exception as e:
             raise Exception(f"Care plan validation failed: {str(e)}")
     
+    async def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts with one embeddings request"""
+        try:
+            response = await self.client.embeddings.create(model=self.embedding_model, input=texts)
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except Exception as e:
+            raise Exception(f"Embedding request failed: {str(e)}")
+    
+    def _log_prompt_cache_usage(self, usage: Any) -> None:
+        """Record how much of the prompt was served from OpenAI's prompt cache"""
+        details = getattr(usage, "prompt_tokens_details", None)
+        logger.debug(
+            "Care plan prompt usage",
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            cached_prompt_tokens=getattr(details, "cached_tokens", None)
+        )
+    
+    def _care_plan_messages(
+        self,
+        patient_intake: PatientIntake,
+        ehr_data: Optional[EHRRecord],
+        guidelines: Optional[List[Guideline]]
+    ) -> List[Dict[str, str]]:
+        """Chat messages for a care plan request"""
+        return [
+            {"role": "system", "content": self._build_system_prompt()},
+            {"role": "user", "content": self._build_care_plan_prompt(patient_intake, ehr_data, guidelines)}
+        ]
+    
     def _build_system_prompt(self) -> str:
-        """Build the system prompt for care plan generation"""
-        return """You are an expert clinical AI assistant specializing in personalized care plan generation.
-        
-        Your role is to:
-        1. Analyze patient intake data and medical history
-        2. Consider relevant clinical guidelines and evidence
-        3. Generate comprehensive, personalized care plans
-        4. Ensure all recommendations are evidence-based and safe
-        5. Include appropriate monitoring and follow-up instructions
-        
-        Always provide your response in structured JSON format with the following sections:
-        - primary_diagnosis
-        - secondary_diagnoses
-        - clinical_summary
-        - actions (with priority, timeline, and rationale)
-        - short_term_goals
-        - long_term_goals
-        - success_metrics
-        - patient_instructions
-        - educational_resources
-        
-        Remember: This is a draft for clinician review, not final medical advice."""
+        """System prompt for care plan generation"""
+        return self._SYSTEM_PROMPT
     
     def _build_care_plan_prompt(
         self,
@@ -155,61 +250,59 @@ class LLMClient:
     ) -> str:
         """Build the user prompt with patient data"""
         
-        prompt_parts = [
-            "Generate a personalized care plan based on the following patient information:",
-            "",
-            "PATIENT INTAKE DATA:",
-            f"Patient ID: {patient_intake.patient_id}",
-            f"Age: {patient_intake.age}, Gender: {patient_intake.gender}",
-            f"Chief Complaint: {patient_intake.chief_complaint}",
-            ""
-        ]
-        
         # Add symptoms
-        if patient_intake.symptoms:
-            prompt_parts.append("SYMPTOMS:")
-            for symptom in patient_intake.symptoms:
-                prompt_parts.append(f"- {symptom.description} (severity: {symptom.severity}/10)")
-            prompt_parts.append("")
+        symptoms = _prompt_section("SYMPTOMS:", [
+            f"- {symptom.description} (severity: {symptom.severity}/10)"
+            for symptom in patient_intake.symptoms
+        ])
         
         # Add medical history
-        if patient_intake.medical_history:
-            prompt_parts.append("MEDICAL HISTORY:")
-            for history in patient_intake.medical_history:
-                prompt_parts.append(f"- {history.condition} ({history.status})")
-            prompt_parts.append("")
+        history = _prompt_section("MEDICAL HISTORY:", [
+            f"- {history.condition} ({history.status})"
+            for history in patient_intake.medical_history
+        ])
         
         # Add current medications
-        if patient_intake.current_medications:
-            prompt_parts.append("CURRENT MEDICATIONS:")
-            for med in patient_intake.current_medications:
-                prompt_parts.append(f"- {med.name} {med.dosage} {med.frequency}")
-            prompt_parts.append("")
+        medications = _prompt_section("CURRENT MEDICATIONS:", [
+            f"- {med.name} {med.dosage} {med.frequency}"
+            for med in patient_intake.current_medications
+        ])
         
         # Add EHR data if available
+        ehr = ""
         if ehr_data:
-            prompt_parts.append("EHR DATA:")
+            ehr_lines = []
             if ehr_data.diagnoses:
-                prompt_parts.append("Recent Diagnoses:")
-                for dx in ehr_data.diagnoses[-5:]:  # Last 5 diagnoses
-                    prompt_parts.append(f"- {dx.description} ({dx.diagnosis_date.strftime('%Y-%m-%d')})")
-            
+                ehr_lines.append("Recent Diagnoses:")
+                ehr_lines.extend(
+                    f"- {dx.description} ({dx.diagnosis_date:%Y-%m-%d})"
+                    for dx in ehr_data.diagnoses[-5:]  # Last 5 diagnoses
+                )
             if ehr_data.lab_results:
-                prompt_parts.append("Recent Lab Results:")
-                for lab in ehr_data.lab_results[-5:]:  # Last 5 results
-                    prompt_parts.append(f"- {lab.test_name}: {lab.value} {lab.unit or ''} ({lab.status})")
-            prompt_parts.append("")
+                ehr_lines.append("Recent Lab Results:")
+                ehr_lines.extend(
+                    f"- {lab.test_name}: {lab.value} {lab.unit or ''} ({lab.status})"
+                    for lab in ehr_data.lab_results[-5:]  # Last 5 results
+                )
+            ehr = _prompt_section("EHR DATA:", ehr_lines, always=True)
         
         # Add relevant guidelines
-        if guidelines:
-            prompt_parts.append("RELEVANT CLINICAL GUIDELINES:")
-            for guideline in guidelines[:3]:  # Top 3 most relevant
-                prompt_parts.append(f"- {guideline.content[:200]}...")
-            prompt_parts.append("")
+        guideline_section = _prompt_section("RELEVANT CLINICAL GUIDELINES:", [
+            f"- {guideline.content[:200]}..."
+            for guideline in (guidelines or [])[:3]  # Top 3 most relevant
+        ])
         
-        prompt_parts.append("Please generate a comprehensive care plan in JSON format.")
-        
-        return "\n".join(prompt_parts)
+        return self._CARE_PLAN_PROMPT_TEMPLATE.format(
+            patient_id=patient_intake.patient_id,
+            age=patient_intake.age,
+            gender=patient_intake.gender,
+            chief_complaint=patient_intake.chief_complaint,
+            symptoms=symptoms,
+            history=history,
+            medications=medications,
+            ehr=ehr,
+            guidelines=guideline_section
+        )
     
     def _calculate_confidence_score(self, care_plan: Dict[str, Any]) -> float:
         """Calculate confidence score based on plan completeness"""
@@ -226,4 +319,8 @@ class LLMClient:
             if section in care_plan and care_plan[section]:
                 score += 1.0
         
-        return score / total_components
\ No newline at end of file
+        return score / total_components
+    
+    async def close(self):
+        """Close the underlying OpenAI HTTP client"""
+        await self.client.close()
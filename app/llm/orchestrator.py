@@ -1,7 +1,10 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Mapping
+from dataclasses import dataclass
 from datetime import datetime
-import json
+from types import MappingProxyType
+import orjson
 from pathlib import Path
+import re
 
 from .client import LLMClient
 from ..models.careplan import CarePlan, CarePlanAction, Priority, ActionType
@@ -10,6 +13,119 @@ from ..models.ehr import EHRRecord
 from ..models.guideline import Guideline
 from ..ehr.client import EHRClient
 from ..retrieval.vector_store import VectorStore
+from ..retrieval.embeddings import EmbeddingBatcher
+
+
+@dataclass(frozen=True, slots=True)
+class _MockPlanTemplate:
+    """Canned actions and goals for the mock care plan generator (shared; read-only)"""
+    actions: Tuple[Mapping[str, str], ...]
+    goals: Tuple[str, ...]
+
+
+def _actions(*actions: Dict[str, str]) -> Tuple[Mapping[str, str], ...]:
+    return tuple(MappingProxyType(action) for action in actions)
+
+
+_DIABETES_MOCK_PLAN = _MockPlanTemplate(
+    actions=_actions(
+        {
+            "type": "medication",
+            "description": "Continue Metformin 500mg twice daily",
+            "priority": "high",
+            "timeline": "ongoing",
+            "rationale": "Blood glucose management"
+        },
+        {
+            "type": "lifestyle",
+            "description": "Low-carb diet consultation with nutritionist",
+            "priority": "high",
+            "timeline": "within 2 weeks",
+            "rationale": "Dietary management essential for diabetes control"
+        },
+        {
+            "type": "monitoring",
+            "description": "HbA1c testing every 3 months",
+            "priority": "medium",
+            "timeline": "quarterly",
+            "rationale": "Monitor long-term glucose control"
+        }
+    ),
+    goals=(
+        "Achieve HbA1c < 7%",
+        "Maintain stable blood glucose levels",
+        "Prevent diabetic complications"
+    )
+)
+
+_HYPERTENSION_MOCK_PLAN = _MockPlanTemplate(
+    actions=_actions(
+        {
+            "type": "medication",
+            "description": "Start ACE inhibitor (Lisinopril 10mg daily)",
+            "priority": "high",
+            "timeline": "immediately",
+            "rationale": "First-line treatment for hypertension"
+        },
+        {
+            "type": "lifestyle",
+            "description": "Reduce sodium intake to <2g/day",
+            "priority": "high",
+            "timeline": "ongoing",
+            "rationale": "Dietary sodium reduction improves BP control"
+        },
+        {
+            "type": "monitoring",
+            "description": "Home blood pressure monitoring twice daily",
+            "priority": "medium",
+            "timeline": "daily",
+            "rationale": "Track treatment response"
+        }
+    ),
+    goals=(
+        "Achieve blood pressure <130/80 mmHg",
+        "Reduce cardiovascular risk",
+        "Maintain medication adherence"
+    )
+)
+
+# Action descriptions are format_map templates over {chief_complaint}
+_GENERIC_MOCK_PLAN = _MockPlanTemplate(
+    actions=_actions(
+        {
+            "type": "diagnostic",
+            "description": "Further evaluation of {chief_complaint}",
+            "priority": "high",
+            "timeline": "within 1 week",
+            "rationale": "Need additional information for proper diagnosis"
+        },
+        {
+            "type": "lifestyle",
+            "description": "General wellness consultation",
+            "priority": "medium",
+            "timeline": "within 2 weeks",
+            "rationale": "Address overall health optimization"
+        }
+    ),
+    goals=(
+        "Establish accurate diagnosis",
+        "Address patient concerns",
+        "Develop comprehensive treatment plan"
+    )
+)
+
+# Lowercase chief-complaint keyword -> template, in priority order
+_MOCK_PLAN_KEYWORDS: Tuple[Tuple[str, _MockPlanTemplate], ...] = (
+    ("diabetes", _DIABETES_MOCK_PLAN),
+    ("hypertension", _HYPERTENSION_MOCK_PLAN),
+    ("blood pressure", _HYPERTENSION_MOCK_PLAN),
+)
+_MOCK_PLAN_RANKS = {keyword: rank for rank, (keyword, _) in enumerate(_MOCK_PLAN_KEYWORDS)}
+# One alternation over every keyword, so classifying a complaint is a single scan
+# (longest first; none of the keywords can overlap one another in a complaint)
+_MOCK_PLAN_PATTERN = re.compile("|".join(
+    re.escape(keyword) for keyword in sorted(_MOCK_PLAN_RANKS, key=len, reverse=True)
+))
 
 
 class CarePlanOrchestrator:
@@ -26,33 +142,87 @@ class CarePlanOrchestrator:
         self.vector_store = vector_store
         self.sample_data_path = Path(__file__).parent.parent.parent / "scripts" / "seed_data" / "sample_data.json"
         self._careplan_storage = {}  # In-memory storage for development
+        # Concurrent guideline searches share embedding requests
+        self._embedding_batcher = EmbeddingBatcher(lambda texts: self.llm_client.embed_texts(texts))
+        # Parsed sample data and its lookup indexes, keyed by the file's (mtime_ns, size)
+        self._sample_cache: Dict[str, Any] = {"key": None, "data": None, "indexes": None}
     
     def _load_sample_data(self) -> Dict[str, Any]:
-        """Load sample data from JSON file."""
+        """Load sample data from JSON file (cached until the file changes; treat as read-only)."""
         try:
             if self.sample_data_path.exists():
-                with open(self.sample_data_path, 'r') as f:
-                    return json.load(f)
+                stat = self.sample_data_path.stat()
+                key = (stat.st_mtime_ns, stat.st_size)
+                if self._sample_cache["key"] != key:
+                    data = orjson.loads(self.sample_data_path.read_bytes())
+                    self._sample_cache["data"] = data
+                    self._sample_cache["indexes"] = self._build_sample_indexes(data)
+                    self._sample_cache["key"] = key
+                return self._sample_cache["data"]
             return {"intakes": [], "patients": [], "care_plans": []}
         except Exception:
             return {"intakes": [], "patients": [], "care_plans": []}
     
-    async def generate_careplan_draft(self, patient_id: str) -> Dict[str, Any]:
-        """Generate complete care plan draft from patient intake data"""
+    def _sample_indexes(self) -> Dict[str, Dict[str, Any]]:
+        """Lookups over the current sample data (empty when there is none)"""
+        data = self._load_sample_data()
+        if self._sample_cache["data"] is not data:
+            return self._build_sample_indexes(data)
+        return self._sample_cache["indexes"]
+    
+    @staticmethod
+    def _build_sample_indexes(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Group sample records by patient and care plan ID, keeping file order"""
+        intakes_by_patient: Dict[str, List[Dict[str, Any]]] = {}
+        ehr_by_patient: Dict[str, Dict[str, Any]] = {}
+        plans_by_patient: Dict[str, List[Dict[str, Any]]] = {}
+        plans_by_id: Dict[str, List[Dict[str, Any]]] = {}
+        
+        for intake in data.get("intakes", []):
+            intakes_by_patient.setdefault(intake.get("patient_id"), []).append(intake)
+        for ehr in data.get("ehr_records", []):
+            ehr_by_patient.setdefault(ehr.get("patient_id"), ehr)
+        for care_plan_data in data.get("care_plans", []):
+            plans_by_patient.setdefault(care_plan_data.get("patient_id"), []).append(care_plan_data)
+            plans_by_id.setdefault(care_plan_data.get("careplan_id"), []).append(care_plan_data)
+        
+        return {
+            "intakes_by_patient": intakes_by_patient,
+            "ehr_by_patient": ehr_by_patient,
+            "plans_by_patient": plans_by_patient,
+            "plans_by_id": plans_by_id,
+        }
+    
+    def invalidate_sample_data(self) -> None:
+        """Drop the cached sample data so the next access re-reads the file"""
+        self._sample_cache["key"] = None
+    
+    async def generate_careplan_draft(self, patient_id: str, override_existing: bool = True) -> Dict[str, Any]:
+        """
+        Generate complete care plan draft from patient intake data
+        
+        With override_existing=False, an existing draft is returned as
+        {"status": "exists", "careplan_id": ...} instead of generating a new one.
+        """
         
         # 1. Retrieve patient intake data from sample data
-        sample_data = self._load_sample_data()
+        indexes = self._sample_indexes()
+        
+        if not override_existing:
+            existing_draft = self._find_existing_draft(patient_id, indexes)
+            if existing_draft:
+                return {"status": "exists", "careplan_id": existing_draft.careplan_id}
+        
         intake_data = None
         
-        for intake in sample_data.get("intakes", []):
-            if intake.get("patient_id") == patient_id:
-                # Convert dict to PatientIntake model
-                try:
-                    intake_data = PatientIntake(**intake)
-                    break
-                except Exception as e:
-                    print(f"Error converting intake data: {e}")
-                    continue
+        for intake in indexes["intakes_by_patient"].get(patient_id, ()):
+            # Convert dict to PatientIntake model
+            try:
+                intake_data = PatientIntake(**intake)
+                break
+            except Exception as e:
+                print(f"Error converting intake data: {e}")
+                continue
         
         if not intake_data:
             raise ValueError(f"No intake data found for patient {patient_id}")
@@ -60,10 +230,9 @@ class CarePlanOrchestrator:
         # 2. Try to fetch EHR data (may not exist for sample data)
         ehr_data = None
         try:
-            for ehr in sample_data.get("ehr_records", []):
-                if ehr.get("patient_id") == patient_id:
-                    ehr_data = EHRRecord(**ehr)
-                    break
+            ehr = indexes["ehr_by_patient"].get(patient_id)
+            if ehr is not None:
+                ehr_data = EHRRecord(**ehr)
         except Exception as e:
             print(f"Warning: Could not load EHR data: {e}")
         
@@ -89,6 +258,7 @@ class CarePlanOrchestrator:
         self._careplan_storage[care_plan.careplan_id] = care_plan
         
         return {
+            "status": "success",
             "careplan_id": care_plan.careplan_id,
             "model_used": llm_result.get("model_used", "mock"),
             "tokens_used": llm_result.get("tokens_used", 0),
@@ -98,20 +268,44 @@ class CarePlanOrchestrator:
     
     async def get_existing_draft(self, patient_id: str) -> Optional[CarePlan]:
         """Check for existing draft care plan"""
+        return self._find_existing_draft(patient_id, self._sample_indexes())
+    
+    async def get_existing_drafts(self, patient_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Map each patient ID to the careplan_id of its existing draft (or None) in one pass"""
+        wanted = set(patient_ids)
+        found: Dict[str, str] = {}
+        
+        # Check in-memory storage first
+        for care_plan in self._careplan_storage.values():
+            if care_plan.patient_id in wanted:
+                found.setdefault(care_plan.patient_id, care_plan.careplan_id)
+        
+        # Then sample data, for patients still missing
+        plans_by_patient = self._sample_indexes()["plans_by_patient"]
+        for patient_id in wanted.difference(found):
+            for care_plan_data in plans_by_patient.get(patient_id, ()):
+                try:
+                    found[patient_id] = CarePlan(**care_plan_data).careplan_id
+                    break
+                except Exception as e:
+                    print(f"Error converting care plan data: {e}")
+        
+        return {patient_id: found.get(patient_id) for patient_id in patient_ids}
+    
+    def _find_existing_draft(self, patient_id: str, indexes: Dict[str, Dict[str, Any]]) -> Optional[CarePlan]:
+        """Find a patient's draft in memory or in the already-loaded sample indexes"""
         # Check in-memory storage first
         for careplan_id, care_plan in self._careplan_storage.items():
             if care_plan.patient_id == patient_id:
                 return care_plan
         
         # Check sample data for existing care plans
-        sample_data = self._load_sample_data()
-        for care_plan_data in sample_data.get("care_plans", []):
-            if care_plan_data.get("patient_id") == patient_id:
-                try:
-                    return CarePlan(**care_plan_data)
-                except Exception as e:
-                    print(f"Error converting care plan data: {e}")
-                    continue
+        for care_plan_data in indexes["plans_by_patient"].get(patient_id, ()):
+            try:
+                return CarePlan(**care_plan_data)
+            except Exception as e:
+                print(f"Error converting care plan data: {e}")
+                continue
         
         return None
     
@@ -122,14 +316,12 @@ class CarePlanOrchestrator:
             return self._careplan_storage[careplan_id]
         
         # Check sample data
-        sample_data = self._load_sample_data()
-        for care_plan_data in sample_data.get("care_plans", []):
-            if care_plan_data.get("careplan_id") == careplan_id:
-                try:
-                    return CarePlan(**care_plan_data)
-                except Exception as e:
-                    print(f"Error converting care plan data: {e}")
-                    continue
+        for care_plan_data in self._sample_indexes()["plans_by_id"].get(careplan_id, ()):
+            try:
+                return CarePlan(**care_plan_data)
+            except Exception as e:
+                print(f"Error converting care plan data: {e}")
+                continue
         
         return None
     
@@ -224,9 +416,7 @@ class CarePlanOrchestrator:
     
     async def _get_text_embedding(self, text: str) -> List[float]:
         """Get text embedding for vector search"""
-        # Placeholder - would use actual embedding service (OpenAI, etc.)
-        # For now, return dummy embedding
-        return [0.1] * 1536
+        return await self._embedding_batcher.embed(text)
     
     async def _convert_to_careplan_model(
         self,
@@ -283,113 +473,42 @@ class CarePlanOrchestrator:
     ) -> CarePlan:
         """Update specific section of care plan"""
         
-        # Create a copy of the care plan
-        updated_plan = care_plan.copy(deep=True)
-        updated_plan.last_modified = datetime.utcnow()
-        updated_plan.version += 1
+        changes: Dict[str, Any] = {
+            "last_modified": datetime.utcnow(),
+            "version": care_plan.version + 1
+        }
         
         # Update the specified section
-        if hasattr(updated_plan, section):
-            setattr(updated_plan, section, updated_data.get(section))
+        if section in CarePlan.model_fields:
+            changes[section] = updated_data.get(section)
         
-        return updated_plan
+        # Shallow copy: untouched sections are shared with the original, never mutated in place
+        return care_plan.model_copy(update=changes)
     
     def _generate_mock_care_plan(self, intake_data: PatientIntake) -> Dict[str, Any]:
         """Generate mock care plan when LLM is unavailable"""
         
         # Extract key information from intake
         chief_complaint = intake_data.chief_complaint
-        age = intake_data.age
-        gender = intake_data.gender
+        complaint = chief_complaint.lower()
         
-        # Generate realistic mock response based on chief complaint
-        mock_actions = []
-        mock_goals = []
-        
-        # Common conditions and their typical care plans
-        if "diabetes" in chief_complaint.lower():
-            mock_actions = [
-                {
-                    "type": "medication",
-                    "description": "Continue Metformin 500mg twice daily",
-                    "priority": "high",
-                    "timeline": "ongoing",
-                    "rationale": "Blood glucose management"
-                },
-                {
-                    "type": "lifestyle",
-                    "description": "Low-carb diet consultation with nutritionist",
-                    "priority": "high",
-                    "timeline": "within 2 weeks",
-                    "rationale": "Dietary management essential for diabetes control"
-                },
-                {
-                    "type": "monitoring",
-                    "description": "HbA1c testing every 3 months",
-                    "priority": "medium",
-                    "timeline": "quarterly",
-                    "rationale": "Monitor long-term glucose control"
-                }
-            ]
-            mock_goals = [
-                "Achieve HbA1c < 7%",
-                "Maintain stable blood glucose levels",
-                "Prevent diabetic complications"
-            ]
-            
-        elif "hypertension" in chief_complaint.lower() or "blood pressure" in chief_complaint.lower():
-            mock_actions = [
-                {
-                    "type": "medication",
-                    "description": "Start ACE inhibitor (Lisinopril 10mg daily)",
-                    "priority": "high",
-                    "timeline": "immediately",
-                    "rationale": "First-line treatment for hypertension"
-                },
-                {
-                    "type": "lifestyle",
-                    "description": "Reduce sodium intake to <2g/day",
-                    "priority": "high",
-                    "timeline": "ongoing",
-                    "rationale": "Dietary sodium reduction improves BP control"
-                },
-                {
-                    "type": "monitoring",
-                    "description": "Home blood pressure monitoring twice daily",
-                    "priority": "medium",
-                    "timeline": "daily",
-                    "rationale": "Track treatment response"
-                }
-            ]
-            mock_goals = [
-                "Achieve blood pressure <130/80 mmHg",
-                "Reduce cardiovascular risk",
-                "Maintain medication adherence"
-            ]
-            
+        # Common conditions and their typical care plans, highest-priority keyword wins
+        rank = min(
+            (_MOCK_PLAN_RANKS[match.group()] for match in _MOCK_PLAN_PATTERN.finditer(complaint)),
+            default=None
+        )
+        if rank is not None:
+            template = _MOCK_PLAN_KEYWORDS[rank][1]
+            mock_actions = list(template.actions)
+            mock_goals = template.goals
         else:
             # Generic care plan for other conditions
+            fields = {"chief_complaint": chief_complaint}
             mock_actions = [
-                {
-                    "type": "diagnostic",
-                    "description": f"Further evaluation of {chief_complaint}",
-                    "priority": "high",
-                    "timeline": "within 1 week",
-                    "rationale": "Need additional information for proper diagnosis"
-                },
-                {
-                    "type": "lifestyle",
-                    "description": "General wellness consultation",
-                    "priority": "medium",
-                    "timeline": "within 2 weeks",
-                    "rationale": "Address overall health optimization"
-                }
-            ]
-            mock_goals = [
-                "Establish accurate diagnosis",
-                "Address patient concerns",
-                "Develop comprehensive treatment plan"
+                {**action, "description": action["description"].format_map(fields)}
+                for action in _GENERIC_MOCK_PLAN.actions
             ]
+            mock_goals = _GENERIC_MOCK_PLAN.goals
         
         return {
             "care_plan": {
@@ -398,8 +517,8 @@ class CarePlanOrchestrator:
                 "chief_complaint": chief_complaint,
                 "clinical_summary": f"Patient presents with {chief_complaint}. Comprehensive evaluation and management plan developed.",
                 "actions": mock_actions,
-                "short_term_goals": mock_goals[:2],
-                "long_term_goals": mock_goals[2:] if len(mock_goals) > 2 else ["Maintain optimal health"],
+                "short_term_goals": list(mock_goals[:2]),
+                "long_term_goals": list(mock_goals[2:]) if len(mock_goals) > 2 else ["Maintain optimal health"],
                 "success_metrics": [
                     "Patient reports symptom improvement",
                     "Clinical markers within target range",
@@ -1,7 +1,13 @@
 import structlog
+import orjson
 import sys
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
+
+
+def orjson_serializer(obj: Any, default: Optional[Callable[[Any], Any]] = None, **kwargs) -> str:
+    """JSON serializer for structlog's JSONRenderer, encoding with orjson"""
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 def setup_logging(log_level: str = "INFO") -> None:
@@ -33,7 +39,7 @@ def setup_logging(log_level: str = "INFO") -> None:
         processors.append(structlog.dev.ConsoleRenderer())
     else:
         # JSON output for production
-        processors.append(structlog.processors.JSONRenderer())
+        processors.append(structlog.processors.JSONRenderer(serializer=orjson_serializer))
     
     # Configure structlog
     structlog.configure(
@@ -1,7 +1,14 @@
 import structlog
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Callable
 from datetime import datetime
+from contextvars import ContextVar
+import asyncio
 import json
+import os
+import time
+import orjson
+
+from . import orjson_serializer
 
 
 # Configure structured logging
@@ -15,7 +22,7 @@ structlog.configure(
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
+        structlog.processors.JSONRenderer(serializer=orjson_serializer)
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
@@ -24,6 +31,173 @@ structlog.configure(
 )
 
 audit_logger = structlog.get_logger("careplan_audit")
+security_logger = structlog.get_logger("security_audit")
+performance_logger = structlog.get_logger("performance")
+
+# Audit entries buffered for the current request (set by AuditMiddleware)
+MAX_AUDIT_BATCH = 100
+_pending_audit: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("pending_audit", default=None)
+
+
+class AuditFileSink:
+    """Append-only JSON-lines audit file, written with one write() per batch"""
+    
+    def __init__(self, path: str):
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    
+    def write(self, entries: List[Dict[str, Any]]):
+        """Append a batch of entries as JSON lines"""
+        payload = memoryview(b"".join(
+            orjson.dumps(entry, default=str, option=orjson.OPT_APPEND_NEWLINE) for entry in entries
+        ))
+        while payload:
+            payload = payload[os.write(self._fd, payload):]
+    
+    def close(self):
+        """Close the audit file"""
+        os.close(self._fd)
+
+
+# Set AUDIT_LOG_PATH to write audit events to a file instead of the structured log
+AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH")
+audit_file_sink: Optional[AuditFileSink] = AuditFileSink(AUDIT_LOG_PATH) if AUDIT_LOG_PATH else None
+
+
+def write_audit_entries(entries: List[Dict[str, Any]]):
+    """Write a batch of audit entries to the audit sink"""
+    if audit_file_sink is not None:
+        audit_file_sink.write(entries)
+        return
+    for entry in entries:
+        audit_logger.info("audit_event", **entry)
+
+
+def write_security_entries(entries: List[Dict[str, Any]]):
+    """Write a batch of security events to the security audit sink"""
+    for entry in entries:
+        # Descriptions are templates, filled in only here when the event is written
+        fields = entry.pop("description_fields", None)
+        if fields:
+            entry["description"] = entry["description"].format(**fields)
+        security_logger.warning("security_event", **entry)
+
+
+def write_performance_entries(entries: List[Dict[str, Any]]):
+    """Write a batch of performance metrics to the performance log"""
+    for entry in entries:
+        performance_logger.info("performance_metric", **entry)
+
+
+class AuditQueue:
+    """
+    Process-wide audit buffer drained by a single background consumer
+    
+    Entries are written in batches of up to max_batch, or whatever arrived
+    within flush_interval seconds. Once high_water entries are queued,
+    submit() waits while submit_nowait() drops and counts the overflow.
+    Until start() is called, entries are written immediately.
+    Batches go to writer (write_audit_entries by default).
+    """
+    
+    def __init__(
+        self,
+        max_batch: int = 100,
+        flush_interval: float = 0.2,
+        high_water: int = 10000,
+        writer: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+    ):
+        self.writer = writer
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.high_water = high_water
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self.dropped = 0
+    
+    def start(self):
+        """Start the background consumer on the running event loop"""
+        if self._consumer is None:
+            self._queue = asyncio.Queue(maxsize=self.high_water)
+            self._consumer = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the consumer and write out anything still queued"""
+        if self._consumer is None:
+            return
+        self._consumer.cancel()
+        try:
+            await self._consumer
+        except asyncio.CancelledError:
+            pass
+        
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        if remaining:
+            self._write(remaining)
+        self._queue = None
+        self._consumer = None
+    
+    def _write(self, entries: List[Dict[str, Any]]):
+        (self.writer or write_audit_entries)(entries)
+    
+    async def submit(self, entries: List[Dict[str, Any]]):
+        """Queue audit entries for the consumer (waits while the queue is full)"""
+        if self._queue is None:
+            self._write(entries)
+            return
+        for entry in entries:
+            await self._queue.put(entry)
+    
+    def submit_nowait(self, entries: List[Dict[str, Any]]):
+        """Queue audit entries without waiting, dropping any that don't fit"""
+        if self._queue is None:
+            self._write(entries)
+            return
+        for queued, entry in enumerate(entries):
+            try:
+                self._queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                self.dropped += len(entries) - queued
+                audit_logger.warning("audit_queue_full", dropped=len(entries) - queued, total_dropped=self.dropped)
+                return
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.flush_interval
+                
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Don't lose a partially collected batch on shutdown
+                if batch:
+                    self._write(batch)
+                raise
+            
+            try:
+                self._write(batch)
+            except Exception as e:
+                audit_logger.error("audit_write_failed", error=str(e), dropped=len(batch))
+
+
+audit_queue = AuditQueue(max_batch=MAX_AUDIT_BATCH)
+security_audit_queue = AuditQueue(max_batch=MAX_AUDIT_BATCH, writer=write_security_entries)
+performance_queue = AuditQueue(max_batch=MAX_AUDIT_BATCH, writer=write_performance_entries)
 
 
 async def audit_log(
@@ -50,22 +224,45 @@ async def audit_log(
         session_id: Session identifier for request tracking
     """
     
-    audit_entry = {
-        "action": action,
-        "timestamp": datetime.utcnow().isoformat(),
-        "patient_id": patient_id,
-        "careplan_id": careplan_id,
-        "reviewer_id": reviewer_id,
-        "approver_id": approver_id,
-        "user_id": user_id,
-        "session_id": session_id,
-        "details": details or {}
-    }
+    # Entries reach the sinks in batches, not through structlog's TimeStamper,
+    # so the event time is stamped here
+    audit_entry = {"action": action, "timestamp": datetime.utcnow().isoformat()}
+    
+    # Only set identifiers that were given, to keep logs clean
+    if patient_id is not None:
+        audit_entry["patient_id"] = patient_id
+    if careplan_id is not None:
+        audit_entry["careplan_id"] = careplan_id
+    if reviewer_id is not None:
+        audit_entry["reviewer_id"] = reviewer_id
+    if approver_id is not None:
+        audit_entry["approver_id"] = approver_id
+    if user_id is not None:
+        audit_entry["user_id"] = user_id
+    if session_id is not None:
+        audit_entry["session_id"] = session_id
+    audit_entry["details"] = details or {}
     
-    # Remove None values to keep logs clean
-    audit_entry = {k: v for k, v in audit_entry.items() if v is not None}
+    # Inside a request, defer to the middleware's single flush
+    pending = _pending_audit.get()
+    if pending is None:
+        audit_queue.submit_nowait([audit_entry])
+        return
     
-    audit_logger.info("audit_event", **audit_entry)
+    pending.append(audit_entry)
+    if len(pending) >= MAX_AUDIT_BATCH:
+        entries = pending[:]
+        pending.clear()
+        audit_queue.submit_nowait(entries)
+
+
+# Health checks and static assets never touch patient data
+UNAUDITED_PATHS = frozenset({"/health", "/favicon.ico", "/manifest.json", "/logo192.png"})
+UNAUDITED_PATH_PREFIXES = ("/static/",)
+
+
+def _is_unaudited_path(path: str) -> bool:
+    return path in UNAUDITED_PATHS or path.startswith(UNAUDITED_PATH_PREFIXES)
 
 
 class AuditMiddleware:
@@ -75,19 +272,22 @@ class AuditMiddleware:
         self.app = app
     
     async def __call__(self, scope, receive, send):
-        if scope["type"] == "http":
+        if scope["type"] == "http" and not _is_unaudited_path(scope["path"]):
             # Extract request information
             method = scope["method"]
             path = scope["path"]
             
             # Start timing
-            start_time = datetime.utcnow()
+            start_time = time.perf_counter()
+            
+            # Buffer this request's audit events (including background tasks)
+            pending: List[Dict[str, Any]] = []
+            token = _pending_audit.set(pending)
             
             async def send_wrapper(message):
                 if message["type"] == "http.response.start":
                     status_code = message["status"]
-                    end_time = datetime.utcnow()
-                    duration_ms = (end_time - start_time).total_seconds() * 1000
+                    duration_ms = (time.perf_counter() - start_time) * 1000
                     
                     # Log API request
                     await audit_log(
@@ -102,7 +302,12 @@ class AuditMiddleware:
                 
                 await send(message)
             
-            await self.app(scope, receive, send_wrapper)
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                _pending_audit.reset(token)
+                if pending:
+                    audit_queue.submit_nowait(pending)
         else:
             await self.app(scope, receive, send)
 
@@ -156,22 +361,28 @@ async def security_audit_log(
     description: str,
     user_id: Optional[str] = None,
     ip_address: Optional[str] = None,
-    additional_context: Optional[Dict[str, Any]] = None
+    additional_context: Optional[Dict[str, Any]] = None,
+    **description_fields: Any
 ):
-    """Log security-related events"""
+    """
+    Log security-related events
+    
+    description is a str.format template; description_fields fill it in
+    when the event is written, off the request path.
+    """
     
     security_entry = {
         "event_type": event_type,
         "severity": severity,
         "description": description,
+        "description_fields": description_fields,
         "timestamp": datetime.utcnow().isoformat(),
         "user_id": user_id,
         "ip_address": ip_address,
         "context": additional_context or {}
     }
     
-    security_logger = structlog.get_logger("security_audit")
-    security_logger.warning("security_event", **security_entry)
+    security_audit_queue.submit_nowait([security_entry])
 
 
 # Performance monitoring
@@ -191,5 +402,4 @@ async def performance_log(
         "details": details or {}
     }
     
-    perf_logger = structlog.get_logger("performance")
-    perf_logger.info("performance_metric", **perf_entry)
\ No newline at end of file
+    performance_queue.submit_nowait([perf_entry])
\ No newline at end of file
@@ -1,27 +1,51 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import structlog
+import asyncio
 import os
 from pathlib import Path
 from contextlib import asynccontextmanager
 
 from app.api import intake_router, draft_router, review_router, auth_router
+from app.api.auth import auth_service
 from app.api.mock_data import router as mock_router
 from app.api.batch import router as batch_router
-from app.logging.audit import AuditMiddleware
-from app.dependencies import get_settings
+from app.logging.audit import AuditMiddleware, audit_queue, security_audit_queue, performance_queue, audit_file_sink
+from app.dependencies import get_settings, ServiceContainer
+from app.review.service import CarePlanNotFoundError
+
+logger = structlog.get_logger()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
-    structlog.get_logger().info("CarePlan AI starting up...")
+    logger.info("CarePlan AI starting up...")
+    app.state.services = ServiceContainer()
+    # Warm up in the background so startup is not held up by slow upstreams
+    warm_up = asyncio.create_task(app.state.services.warm_up())
+    audit_queue.start()
+    security_audit_queue.start()
+    performance_queue.start()
+    auth_service.start_cleanup()
     yield
     # Shutdown
-    structlog.get_logger().info("CarePlan AI shutting down...")
+    warm_up.cancel()
+    await auth_service.stop_cleanup()
+    if auth_service.session_store is not None:
+        await auth_service.session_store.close()
+    if auth_service.user_repository is not None:
+        auth_service.user_repository.close()
+    await app.state.services.close()
+    await audit_queue.stop()
+    await security_audit_queue.stop()
+    await performance_queue.stop()
+    if audit_file_sink is not None:
+        audit_file_sink.close()
+    logger.info("CarePlan AI shutting down...")
 
 
 # Create FastAPI application
@@ -31,6 +55,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -109,10 +134,15 @@ else:
         }
 
 
+@app.exception_handler(CarePlanNotFoundError)
+async def careplan_not_found_handler(request: Request, exc: CarePlanNotFoundError):
+    """Unknown care plan IDs from the review workflow are a 404."""
+    return ORJSONResponse(status_code=404, content={"detail": "Care plan not found"})
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Global exception handler."""
-    logger = structlog.get_logger()
     logger.error(
         "Unhandled exception",
         path=request.url.path,
@@ -0,0 +1,69 @@
+from typing import List, Tuple, Callable, Awaitable, Optional, Set
+import asyncio
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into batched embedding calls"""
+    
+    def __init__(
+        self,
+        embed_many: Callable[[List[str]], Awaitable[List[List[float]]]],
+        max_batch: int = 32,
+        max_wait: float = 0.005,
+        max_concurrent_batches: int = 4
+    ):
+        self._embed_many = embed_many
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._batch_slots = asyncio.Semaphore(max_concurrent_batches)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()  # keeps in-flight batches referenced
+    
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text, sharing a call with requests arriving within max_wait"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.max_wait, self._flush)
+        
+        return await future
+    
+    def _flush(self) -> None:
+        """Send everything pending as one batch"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+    
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        async with self._batch_slots:
+            try:
+                vectors = await self._embed_many([text for text, _ in batch])
+            except Exception as e:
+                self._fail(batch, e)
+                return
+        
+        if len(vectors) != len(batch):
+            self._fail(batch, ValueError(f"Expected {len(batch)} embeddings, got {len(vectors)}"))
+            return
+        
+        # Callers that gave up (cancelled futures) are skipped
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+    
+    @staticmethod
+    def _fail(batch: List[Tuple[str, asyncio.Future]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
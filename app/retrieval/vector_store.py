@@ -10,9 +10,25 @@ from ..models.guideline import Guideline
 class VectorStore:
     """FAISS-based vector store for clinical guidelines retrieval"""
     
-    def __init__(self, dimension: int = 1536, index_type: str = "flat"):
+    def __init__(
+        self,
+        dimension: int = 1536,
+        index_type: str = "flat",
+        hnsw_m: int = 32,
+        hnsw_ef_search: int = 64,
+        ivf_nlist: int = 100,
+        ivf_nprobe: int = 8,
+        pq_m: int = 64,
+        pq_nbits: int = 8
+    ):
         self.dimension = dimension
         self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivf_nlist = ivf_nlist
+        self.ivf_nprobe = ivf_nprobe
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
         self.index = None
         self.guidelines: List[Guideline] = []
         self.id_to_idx: Dict[str, int] = {}
@@ -25,9 +41,34 @@ class VectorStore:
             self.index = faiss.IndexFlatIP(self.dimension)  # Inner product for cosine similarity
         elif self.index_type == "ivf":
             quantizer = faiss.IndexFlatIP(self.dimension)
-            self.index = faiss.IndexIVFFlat(quantizer, self.dimension, 100)
+            self.index = faiss.IndexIVFFlat(quantizer, self.dimension, self.ivf_nlist)
+        elif self.index_type == "hnsw":
+            # Approximate graph search: sublinear in the number of guidelines, needs no
+            # training and accepts incremental adds
+            self.index = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        elif self.index_type == "sq8":
+            # Exact scan over int8 codes: 4x smaller than float32, trains on any corpus size
+            self.index = faiss.IndexScalarQuantizer(
+                self.dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+        elif self.index_type == "ivfpq":
+            # Product-quantized inverted lists (pq_m * pq_nbits bits per vector); training
+            # wants ~40 vectors per list and per PQ centroid, so only for large corpora
+            self.index = faiss.index_factory(
+                self.dimension,
+                f"IVF{self.ivf_nlist},PQ{self.pq_m}x{self.pq_nbits}",
+                faiss.METRIC_INNER_PRODUCT
+            )
         else:
             raise ValueError(f"Unsupported index type: {self.index_type}")
+        self._apply_search_params()
+    
+    def _apply_search_params(self):
+        """Set query-time knobs, which are not all kept by write_index/read_index"""
+        if self.index_type == "hnsw":
+            self.index.hnsw.efSearch = self.hnsw_ef_search
+        elif self.index_type in ("ivf", "ivfpq"):
+            faiss.extract_index_ivf(self.index).nprobe = self.ivf_nprobe
     
     async def add_guidelines(self, guidelines: List[Guideline]):
         """Add guidelines to the vector store"""
@@ -47,8 +88,8 @@ class VectorStore:
         vectors_array = np.vstack(vectors)
         faiss.normalize_L2(vectors_array)
         
-        # Train index if needed (for IVF)
-        if self.index_type == "ivf" and not self.index.is_trained:
+        # Train index if needed (IVF and quantized indexes)
+        if not self.index.is_trained:
             self.index.train(vectors_array)
         
         # Add vectors to index
@@ -171,6 +212,7 @@ class VectorStore:
         self.id_to_idx = data["id_to_idx"]
         self.dimension = data["dimension"]
         self.index_type = data["index_type"]
+        self._apply_search_params()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store"""
@@ -7,6 +7,10 @@ from pathlib import Path
 from ..models.careplan import CarePlan, ClinicianReview, CarePlanStatus
 
 
+class CarePlanNotFoundError(ValueError):
+    """Raised when a care plan ID doesn't match any stored plan"""
+
+
 class ReviewRequest(BaseModel):
     reviewer_id: str
     reviewer_name: str
@@ -59,7 +63,7 @@ class ReviewService:
         # 1. Retrieve the care plan
         care_plan = await self._get_careplan(careplan_id)
         if not care_plan:
-            raise ValueError(f"Care plan {careplan_id} not found")
+            raise CarePlanNotFoundError(f"Care plan {careplan_id} not found")
         
         # 2. Create review record
         review = ClinicianReview(
@@ -109,7 +113,7 @@ class ReviewService:
         # 1. Retrieve the care plan
         care_plan = await self._get_careplan(careplan_id)
         if not care_plan:
-            raise ValueError(f"Care plan {careplan_id} not found")
+            raise CarePlanNotFoundError(f"Care plan {careplan_id} not found")
         
         # 2. Verify care plan is ready for approval
         if care_plan.status not in [CarePlanStatus.APPROVED, CarePlanStatus.UNDER_REVIEW]:
@@ -146,7 +150,7 @@ class ReviewService:
         
         care_plan = await self._get_careplan(careplan_id)
         if not care_plan:
-            raise ValueError(f"Care plan {careplan_id} not found")
+            raise CarePlanNotFoundError(f"Care plan {careplan_id} not found")
         
         history = []
         for review in care_plan.clinician_reviews:
@@ -167,7 +171,7 @@ class ReviewService:
         # 1. Retrieve and validate care plan
         care_plan = await self._get_careplan(careplan_id)
         if not care_plan:
-            raise ValueError(f"Care plan {careplan_id} not found")
+            raise CarePlanNotFoundError(f"Care plan {careplan_id} not found")
         
         if care_plan.status != CarePlanStatus.APPROVED:
             raise ValueError(f"Care plan {careplan_id} is not approved for patient delivery")
@@ -0,0 +1,184 @@
+import asyncio
+from pathlib import Path
+
+import pandas as pd
+
+import app.api.batch as batch
+
+from app.api.batch import (
+    transform_kaggle_patient_data,
+    generate_actions_for_condition,
+    get_batch_job_status,
+    _put_job,
+    _update_job,
+)
+
+
+class TestBatchTransform:
+    """Test suite for Kaggle dataset transformation."""
+    
+    def test_transform_kaggle_patient_data(self):
+        """Test that rows map to linked patient, intake and EHR records."""
+        df = pd.DataFrame([
+            {
+                "Name": "Bobby Jackson",
+                "Age": 30,
+                "Gender": "Male",
+                "Medical Condition": "Diabetes",
+                "Medication": "Metformin,Insulin",
+                "Billing Amount": 1234.5,
+                "Room Number": 328
+            },
+            {
+                "Name": None,
+                "Age": None,
+                "Medical Condition": "Asthma",
+                "Medication": None
+            }
+        ])
+        
+        patients, intakes, ehr_records = transform_kaggle_patient_data(df)
+        
+        assert len(patients) == len(intakes) == len(ehr_records) == 2
+        assert patients[0]["name"] == "Bobby Jackson"
+        assert patients[0]["age"] == 30
+        assert patients[1]["name"] == "Patient 2"
+        assert patients[1]["age"] == 30
+        assert patients[1]["gender"] == "Unknown"
+        assert patients[1]["blood_type"] == "O+"
+        
+        assert intakes[0]["patient_id"] == patients[0]["patient_id"]
+        assert intakes[0]["current_medications"] == ["Metformin", "Insulin"]
+        assert intakes[1]["current_medications"] == []
+        
+        assert ehr_records[0]["patient_id"] == patients[0]["patient_id"]
+        assert ehr_records[0]["billing_amount"] == 1234.5
+        assert ehr_records[0]["room_number"] == 328
+        assert ehr_records[1]["billing_amount"] == 0.0
+        assert ehr_records[1]["room_number"] == 101
+    
+    def test_transform_kaggle_sample_file(self):
+        """Test transformation of the bundled sample dataset."""
+        data_path = Path(__file__).parent.parent.parent / "data" / "healthcare_dataset_1.csv"
+        df = pd.read_csv(data_path)
+        
+        patients, intakes, ehr_records = transform_kaggle_patient_data(df)
+        
+        assert len(patients) == len(df)
+        assert all(isinstance(p["age"], int) for p in patients)
+        assert all(isinstance(e["billing_amount"], float) for e in ehr_records)
+
+
+
+class TestBatchActions:
+    """Test suite for condition-based action generation."""
+    
+    def test_actions_are_independent_per_call(self):
+        """Test that cached templates still yield fresh actions per patient."""
+        first = generate_actions_for_condition("Diabetes")
+        second = generate_actions_for_condition("Diabetes")
+        
+        assert len(first) == 4
+        assert first[0]["description"].endswith("for Diabetes")
+        assert first[0]["action_id"] != second[0]["action_id"]
+        
+        first[0]["contraindications"].append("pregnancy")
+        assert second[0]["contraindications"] == []
+    
+    def test_condition_specific_actions(self):
+        """Test that diabetes and hypertension add monitoring actions."""
+        actions = generate_actions_for_condition("Hypertension")
+        
+        assert len(actions) == 4
+        assert actions[-1]["description"] == "Blood pressure monitoring protocol"
+        assert len(generate_actions_for_condition("Asthma")) == 3
+
+
+
+class TestBatchJobStatus:
+    """Test suite for batch job status polling."""
+    
+    async def test_long_poll_returns_on_update(self):
+        """Test that wait=true returns as soon as the job changes."""
+        await _put_job("poll-job", {"job_id": "poll-job", "status": "processing", "errors": []})
+        
+        poll = asyncio.create_task(get_batch_job_status("poll-job", wait=True, timeout=5))
+        await asyncio.sleep(0.01)
+        await _update_job("poll-job", processed_records=3)
+        
+        status = await asyncio.wait_for(poll, 1)
+        assert status["processed_records"] == 3
+        assert "_event" not in status
+    
+    async def test_long_poll_times_out(self):
+        """Test that wait=true falls back to the current status on timeout."""
+        await _put_job("idle-job", {"job_id": "idle-job", "status": "processing", "errors": []})
+        
+        status = await get_batch_job_status("idle-job", wait=True, timeout=0.01)
+        assert status["status"] == "processing"
+
+
+
+class TestSampleDataCache:
+    """Test suite for cached sample data loading."""
+    
+    def test_load_returns_independent_lists(self, tmp_path, monkeypatch):
+        """Test that cached loads can be extended without leaking into the cache."""
+        monkeypatch.setattr(batch, "BATCH_DATA_PATH", tmp_path)
+        monkeypatch.setattr(batch, "SAMPLE_DATA_PATH", tmp_path / "sample_data.json")
+        assert batch.save_sample_data({"patients": [{"patient_id": "p1"}], "care_plans": []})
+        
+        first = batch.load_sample_data()
+        first["patients"].append({"patient_id": "p2"})
+        
+        assert len(batch.load_sample_data()["patients"]) == 1
+    
+    def test_save_invalidates_cache(self, tmp_path, monkeypatch):
+        """Test that appended records are visible on the next load."""
+        monkeypatch.setattr(batch, "BATCH_DATA_PATH", tmp_path)
+        monkeypatch.setattr(batch, "SAMPLE_DATA_PATH", tmp_path / "sample_data.json")
+        assert batch.load_sample_data()["patients"] == []
+        
+        assert batch.append_records({"patients": [{"patient_id": "p1"}]})
+        
+        assert batch.load_sample_data()["patients"] == [{"patient_id": "p1"}]
+
+    
+    async def test_stats_after_append_skip_reparse(self, tmp_path, monkeypatch):
+        """Test that stats after our own write are served without re-parsing the file."""
+        monkeypatch.setattr(batch, "BATCH_DATA_PATH", tmp_path)
+        monkeypatch.setattr(batch, "SAMPLE_DATA_PATH", tmp_path / "sample_data.json")
+        assert batch.append_records({"patients": [{"patient_id": "p1"}, {"patient_id": "p2"}]})
+        
+        def fail_loads(_):
+            raise AssertionError("sample data was re-parsed")
+        monkeypatch.setattr(batch.orjson, "loads", fail_loads)
+        
+        stats = await batch.get_batch_stats()
+        assert stats["total_patients"] == 2
+        assert stats["patients_without_care_plans"] == 2
+
+
+
+class TestBatchUpload:
+    """Test suite for batch upload validation."""
+    
+    def test_rejects_unsupported_file_type(self, client):
+        """Test that non-tabular uploads are rejected with 400."""
+        response = client.post(
+            "/api/batch/intake/upload",
+            files={"file": ("notes.txt", b"hello", "text/plain")}
+        )
+        
+        assert response.status_code == 400
+    
+    def test_rejects_oversize_upload(self, client, monkeypatch):
+        """Test that uploads above MAX_UPLOAD_BYTES are rejected with 413."""
+        monkeypatch.setattr(batch, "MAX_UPLOAD_BYTES", 16)
+        
+        response = client.post(
+            "/api/batch/intake/upload",
+            files={"file": ("patients.csv", b"Name,Age\n" * 10, "text/csv")}
+        )
+        
+        assert response.status_code == 413
@@ -0,0 +1,57 @@
+from collections import OrderedDict
+
+import orjson
+
+import app.api.mock_data as mock_data
+
+
+class TestMockDataCaching:
+    """Test suite for conditional GETs on the mock data API."""
+    
+    def test_etag_round_trip(self, client, tmp_path, monkeypatch):
+        """Test that a matching If-None-Match gets 304 until a review changes the data."""
+        sample_path = tmp_path / "sample_data.json"
+        sample_path.write_bytes(orjson.dumps({
+            "patients": [{"patient_id": "p1", "name": "Test Patient"}],
+            "care_plans": [{"careplan_id": "cp1", "patient_id": "p1", "status": "under_review"}]
+        }))
+        monkeypatch.setattr(mock_data, "SAMPLE_DATA_PATH", sample_path)
+        monkeypatch.setattr(mock_data, "_care_plan_status_cache", OrderedDict())
+        
+        response = client.get("/api/mock/patients")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        
+        response = client.get("/api/mock/patients", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        
+        client.put("/api/mock/care-plans/cp1/review", json={"action": "approve"})
+        
+        response = client.get("/api/mock/care-plans/cp1", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["status"] == "approved"
+
+    
+    def test_clinician_list_reflects_reviews(self, client, tmp_path, monkeypatch):
+        """Test that only reviewed plans change in the precomputed clinician list."""
+        sample_path = tmp_path / "sample_data.json"
+        sample_path.write_bytes(orjson.dumps({
+            "patients": [{"patient_id": "p1", "name": "Test Patient"}],
+            "care_plans": [
+                {"careplan_id": "cp1", "patient_id": "p1", "status": "under_review"},
+                {"careplan_id": "cp2", "patient_id": "p1", "status": "under_review"}
+            ]
+        }))
+        monkeypatch.setattr(mock_data, "SAMPLE_DATA_PATH", sample_path)
+        monkeypatch.setattr(mock_data, "_care_plan_status_cache", OrderedDict())
+        
+        client.put("/api/mock/care-plans/cp2/review", json={"action": "deny", "comments": "Needs work"})
+        
+        plans = client.get("/api/mock/clinician/care-plans").json()
+        assert [plan["status"] for plan in plans] == ["under_review", "denied"]
+        assert plans[0]["patient_name"] == "Test Patient"
+        assert plans[1]["reviewer_comments"] == "Needs work"
+        
+        pending = client.get("/api/mock/clinician/care-plans", params={"status": "under_review"}).json()
+        assert [plan["careplan_id"] for plan in pending] == ["cp1"]
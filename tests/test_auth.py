@@ -1,8 +1,40 @@
 """
 Tests for authentication functionality
 """
+import asyncio
+import heapq
+import time
+from datetime import datetime, timedelta
+
+import jwt
 import pytest
-from app.auth.service import AuthenticationService
+
+import app.api.auth as auth_api
+import app.logging.audit as audit
+from app.auth.service import AuthenticationService, _decode_hs256, _decode_token, _encode_hs256
+from app.auth.user_repository import UserRepository
+from app.models.auth import LoginRequest
+
+
+class DictSessionStore:
+    """In-memory stand-in for the Redis session store"""
+
+    def __init__(self):
+        self.sessions = {}
+
+    async def save(self, session):
+        self.sessions[session.session_id] = session.model_copy()
+
+    async def get(self, session_id):
+        session = self.sessions.get(session_id)
+        return session.model_copy() if session else None
+
+    async def delete(self, session):
+        self.sessions.pop(session.session_id, None)
+
+    async def session_ids_for_user(self, user_id):
+        return {s.session_id for s in self.sessions.values() if s.user_id == user_id}
+
 
 def test_auth_service_initialization():
     """Test that AuthenticationService initializes correctly"""
@@ -11,24 +43,224 @@ def test_auth_service_initialization():
     assert auth_service.secret_key is not None
     assert auth_service.algorithm == "HS256"
 
+
 def test_password_hashing():
     """Test password hashing functionality"""
     auth_service = AuthenticationService()
     password = "test_password"
     hashed = auth_service.password_context.hash(password)
-    
+
     assert hashed != password
     assert auth_service.password_context.verify(password, hashed)
     assert not auth_service.password_context.verify("wrong_password", hashed)
 
+
 def test_sample_users_loaded():
     """Test that sample users are loaded correctly"""
     auth_service = AuthenticationService()
-    
+
     # Check that some users are loaded
     assert len(auth_service._users) > 0
     assert len(auth_service._email_to_user_id) > 0
-    
+
     # Check for specific test users
     assert "admin@hospital.com" in auth_service._email_to_user_id
-    assert "dr.garcia@hospital.com" in auth_service._email_to_user_id
\ No newline at end of file
+    assert "dr.garcia@hospital.com" in auth_service._email_to_user_id
+
+
+def test_session_cache_invalidated_on_logout(client):
+    """Test that a cached session is rejected after logout"""
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "admin@hospital.com", "password": "admin123"}
+    )
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Second call is served from the session cache
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_change_password_rejects_mismatched_confirmation(client):
+    """Test that non-matching new passwords are rejected, including non-ASCII ones"""
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "admin@hospital.com", "password": "admin123"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = client.post(
+        "/api/auth/change-password",
+        headers=headers,
+        json={
+            "current_password": "admin123",
+            "new_password": "contraseña-nueva",
+            "confirm_password": "contraseña-vieja"
+        }
+    )
+    assert response.status_code == 400
+
+
+def test_audit_events_flushed_once_per_request(client, monkeypatch):
+    """Test that a request's audit events, including background ones, are written in one batch"""
+    batches = []
+    monkeypatch.setattr(audit, "write_audit_entries", lambda entries: batches.append(list(entries)))
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "admin@hospital.com", "password": "admin123"}
+    )
+    assert response.status_code == 200
+
+    assert len(batches) == 1
+    assert {entry["action"] for entry in batches[0]} == {"api_request", "login_success"}
+
+
+async def test_verify_token_uses_cached_decode():
+    """Test that token verification is memoized and rejects bad tokens"""
+    auth_service = AuthenticationService()
+    login = await auth_service.login(
+        LoginRequest(email="admin@hospital.com", password="admin123")
+    )
+
+    _decode_token.cache_clear()
+    payload = auth_service._verify_token(login.access_token)
+    assert payload.session_id == login.session_id
+    assert auth_service._verify_token(login.access_token) == payload
+    assert _decode_token.cache_info().hits == 1
+
+    assert auth_service._verify_token("not-a-jwt") is None
+
+
+async def test_logout_all_sessions_uses_user_index():
+    """Test that logout-all deactivates only the user's own sessions"""
+    auth_service = AuthenticationService()
+    admin = [
+        await auth_service.login(LoginRequest(email="admin@hospital.com", password="admin123"))
+        for _ in range(2)
+    ]
+    clinician = await auth_service.login(
+        LoginRequest(email="dr.garcia@hospital.com", password="doctor123")
+    )
+
+    assert await auth_service.logout_all_sessions("user_admin_1") == 2
+    assert "user_admin_1" not in auth_service._sessions_by_user
+    assert not any(auth_service._sessions[login.session_id].is_active for login in admin)
+    assert auth_service._sessions[clinician.session_id].is_active
+
+
+async def test_cleanup_expired_sessions_pops_only_expired():
+    """Test that the sweep removes expired sessions and keeps refreshed ones"""
+    auth_service = AuthenticationService()
+    expired, refreshed, live = [
+        await auth_service.login(LoginRequest(email="admin@hospital.com", password="admin123"))
+        for _ in range(3)
+    ]
+    past = datetime.utcnow() - timedelta(minutes=1)
+    for login in (expired, refreshed):
+        auth_service._sessions[login.session_id].expires_at = past
+    auth_service._expiry_heap = [
+        (session.expires_at, session.session_id) for session in auth_service._sessions.values()
+    ]
+    heapq.heapify(auth_service._expiry_heap)
+    auth_service._sessions[refreshed.session_id].refresh()
+
+    assert await auth_service.cleanup_expired_sessions() == 1
+    assert expired.session_id not in auth_service._sessions
+    assert refreshed.session_id in auth_service._sessions
+    assert live.session_id in auth_service._sessions
+    assert auth_service._sessions_by_user["user_admin_1"] == {refreshed.session_id, live.session_id}
+
+
+async def test_verify_password_remembers_successes_only():
+    """Test that successful bcrypt checks are cached and failures are not"""
+    auth_service = AuthenticationService()
+    hashed = auth_service.password_context.hash("secret")
+
+    assert await auth_service._verify_password("secret", hashed)
+    assert len(auth_service._verified_passwords) == 1
+    assert await auth_service._verify_password("secret", hashed)
+
+    assert not await auth_service._verify_password("wrong", hashed)
+    assert len(auth_service._verified_passwords) == 1
+
+
+async def test_sessions_shared_through_session_store():
+    """Test that a session store lets separate service instances share sessions"""
+    store = DictSessionStore()
+    worker_a = AuthenticationService(session_store=store)
+    worker_b = AuthenticationService(session_store=store)
+
+    login = await worker_a.login(LoginRequest(email="admin@hospital.com", password="admin123"))
+    assert await worker_b.validate_session(login.access_token) is not None
+
+    assert await worker_b.logout_all_sessions("user_admin_1") == 1
+    assert await worker_a.validate_session(login.access_token) is None
+
+
+async def test_user_repository_persists_users(tmp_path):
+    """Test that users and password changes survive a service restart"""
+    repository = UserRepository(str(tmp_path / "users.db"))
+    auth_service = AuthenticationService(user_repository=repository)
+    assert await auth_service.change_password("user_admin_1", "admin123", "new-admin-pass")
+
+    restarted = AuthenticationService(user_repository=repository)
+    assert restarted.user_repository.get_by_email("admin@hospital.com").user_id == "user_admin_1"
+    assert await restarted.login(LoginRequest(email="admin@hospital.com", password="admin123")) is None
+    assert await restarted.login(LoginRequest(email="admin@hospital.com", password="new-admin-pass"))
+    repository.close()
+
+
+async def test_concurrent_validations_share_one_lookup():
+    """Test that concurrent validations of one token are single-flighted"""
+    auth_service = AuthenticationService()
+    login = await auth_service.login(LoginRequest(email="admin@hospital.com", password="admin123"))
+
+    calls = []
+    original = auth_service._get_session
+
+    async def counting_get_session(session_id):
+        calls.append(session_id)
+        await asyncio.sleep(0.01)
+        return await original(session_id)
+
+    auth_service._get_session = counting_get_session
+    results = await asyncio.gather(*[auth_service.validate_session(login.access_token) for _ in range(5)])
+
+    assert all(result is not None for result in results)
+    assert len(calls) == 1
+    assert auth_service._inflight_validations == {}
+
+
+def test_hs256_tokens_interoperate_with_pyjwt():
+    """Test that the specialised HS256 codec matches PyJWT and rejects tampering"""
+    claims = {"user_id": "u1", "session_id": "s1", "role": "admin", "exp": int(time.time()) + 60, "iat": int(time.time())}
+    token = _encode_hs256(claims, "secret")
+    assert jwt.decode(token, "secret", algorithms=["HS256"]) == claims
+    assert _decode_hs256(jwt.encode(claims, "secret", algorithm="HS256"), "secret") == claims
+
+    header, payload, signature = token.split(".")
+    tampered = f"{header}.{payload}." + ("B" if signature[0] == "A" else "A") + signature[1:]
+    unsigned = jwt.encode(claims, None, algorithm="none")
+    for bad in (tampered, unsigned, "a.b", _encode_hs256(claims, "other")):
+        with pytest.raises(jwt.InvalidTokenError):
+            _decode_hs256(bad, "secret")
+
+
+async def test_session_cache_bypassed_with_session_store(monkeypatch):
+    """Test that a logout on one worker is seen by the endpoint cache on another"""
+    store = DictSessionStore()
+    worker_a = AuthenticationService(session_store=store)
+    worker_b = AuthenticationService(session_store=store)
+    monkeypatch.setattr(auth_api, "auth_service", worker_b)
+
+    login = await worker_a.login(LoginRequest(email="admin@hospital.com", password="admin123"))
+    assert await auth_api._cached_validate(login.access_token) is not None
+    assert await auth_api._cached_validate(login.access_token) is not None
+
+    assert await worker_a.logout(login.session_id)
+    assert await auth_api._cached_validate(login.access_token) is None
@@ -0,0 +1,52 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.ehr import client as ehr_client_module
+from app.ehr.client import EHRClient
+
+
+class TestEHRClientCache:
+    """Test suite for the EHR client's per-patient fetch cache."""
+    
+    @pytest.fixture
+    async def ehr_client(self):
+        """Create EHR client instance for testing."""
+        client = EHRClient(base_url="http://mock-ehr.test", api_key="test-ehr-key")
+        yield client
+        await client.close()
+    
+    @pytest.mark.asyncio
+    async def test_repeat_fetch_is_cached(self, ehr_client: EHRClient):
+        """Test the same section is only fetched once within the TTL."""
+        first = await ehr_client._fetch_diagnoses("patient_1")
+        second = await ehr_client._fetch_diagnoses("patient_1")
+        other = await ehr_client._fetch_diagnoses("patient_2")
+        
+        assert second is first
+        assert other is not first
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_share_one_request(self, ehr_client: EHRClient):
+        """Test concurrent callers for the same key await a single fetch."""
+        first, second = await asyncio.gather(
+            ehr_client._fetch_lab_results("patient_1"),
+            ehr_client._fetch_lab_results("patient_1")
+        )
+        
+        assert second is first
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_and_expiry(self, ehr_client: EHRClient):
+        """Test invalidation and TTL expiry force a fresh fetch."""
+        first = await ehr_client._fetch_vital_signs("patient_1")
+        ehr_client.invalidate_patient("patient_1")
+        second = await ehr_client._fetch_vital_signs("patient_1")
+        assert second is not first
+        
+        with patch.object(ehr_client_module, "EHR_CACHE_TTL", 0):
+            ehr_client.invalidate_patient("patient_1")
+            third = await ehr_client._fetch_vital_signs("patient_1")
+            fourth = await ehr_client._fetch_vital_signs("patient_1")
+        assert fourth is not third
@@ -240,6 +240,32 @@ class TestLLMClient:
             
             assert "LLM generation failed" in str(exc_info.value)
     
+    @pytest.mark.asyncio
+    async def test_stream_care_plan(
+        self,
+        llm_client: LLMClient,
+        sample_patient_intake: PatientIntake
+    ):
+        """Test care plan text is yielded chunk by chunk."""
+        def chunk(content):
+            event = MagicMock()
+            event.choices = [MagicMock()]
+            event.choices[0].delta.content = content
+            return event
+        
+        async def stream():
+            for content in ['{"primary_diagnosis": ', None, '"Type 2 Diabetes"}']:
+                yield chunk(content)
+        
+        with patch.object(llm_client.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = stream()
+            
+            parts = [part async for part in llm_client.stream_care_plan(sample_patient_intake)]
+            
+            assert parts == ['{"primary_diagnosis": ', '"Type 2 Diabetes"}']
+            assert json.loads("".join(parts))["primary_diagnosis"] == "Type 2 Diabetes"
+            assert mock_create.call_args[1]["stream"] is True
+    
     def test_build_system_prompt(self, llm_client: LLMClient):
         """Test system prompt construction."""
         system_prompt = llm_client._build_system_prompt()
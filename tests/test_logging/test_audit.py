@@ -0,0 +1,136 @@
+import asyncio
+
+import orjson
+
+import app.logging.audit as audit
+from app.logging.audit import AuditQueue
+
+
+class TestAuditQueue:
+    """Test suite for the batched audit queue."""
+    
+    async def test_entries_written_in_batches(self, monkeypatch):
+        """Test that queued entries are written in batches of at most max_batch."""
+        batches = []
+        monkeypatch.setattr(audit, "write_audit_entries", lambda entries: batches.append(len(entries)))
+        
+        queue = AuditQueue(max_batch=100, flush_interval=0.05)
+        queue.start()
+        await queue.submit([{"action": f"event_{i}"} for i in range(150)])
+        await asyncio.sleep(0.2)
+        await queue.stop()
+        
+        assert batches == [100, 50]
+    
+    async def test_stop_flushes_pending_entries(self, monkeypatch):
+        """Test that entries queued before shutdown are not lost."""
+        written = []
+        monkeypatch.setattr(audit, "write_audit_entries", lambda entries: written.extend(entries))
+        
+        queue = AuditQueue(flush_interval=10)
+        queue.start()
+        await queue.submit([{"action": "late_event"}])
+        await asyncio.sleep(0.01)
+        await queue.stop()
+        
+        assert written == [{"action": "late_event"}]
+    
+    async def test_writes_directly_when_not_started(self, monkeypatch):
+        """Test that entries are written immediately without a running consumer."""
+        written = []
+        monkeypatch.setattr(audit, "write_audit_entries", lambda entries: written.extend(entries))
+        
+        await AuditQueue().submit([{"action": "direct_event"}])
+        
+        assert written == [{"action": "direct_event"}]
+    
+    async def test_submit_nowait_drops_when_full(self, monkeypatch):
+        """Test that a full queue drops and counts entries instead of waiting."""
+        written = []
+        monkeypatch.setattr(audit, "write_audit_entries", lambda entries: written.extend(entries))
+        
+        queue = AuditQueue(flush_interval=0.01, high_water=2)
+        queue.start()
+        queue.submit_nowait([{"action": f"event_{i}"} for i in range(5)])
+        await queue.stop()
+        
+        assert [entry["action"] for entry in written] == ["event_0", "event_1"]
+        assert queue.dropped == 3
+    
+    async def test_security_events_use_their_own_writer(self, monkeypatch):
+        """Test that security events are queued and written by the security writer."""
+        security, regular = [], []
+        monkeypatch.setattr(audit, "write_audit_entries", regular.extend)
+        queue = AuditQueue(flush_interval=0.01, writer=security.extend)
+        monkeypatch.setattr(audit, "security_audit_queue", queue)
+        
+        queue.start()
+        await audit.security_audit_log("login_failed", "warning", "Failed login attempt")
+        await asyncio.sleep(0.05)
+        await queue.stop()
+        
+        assert [entry["event_type"] for entry in security] == ["login_failed"]
+        assert regular == []
+    
+    async def test_security_events_dropped_when_queue_full(self, monkeypatch):
+        """Test that a backed-up security queue drops events instead of blocking the caller."""
+        security = []
+        queue = AuditQueue(flush_interval=0.01, high_water=1, writer=security.extend)
+        monkeypatch.setattr(audit, "security_audit_queue", queue)
+        
+        queue.start()
+        for _ in range(3):
+            await asyncio.wait_for(audit.security_audit_log("login_failed", "warning", "Failed login attempt"), 1)
+        await queue.stop()
+        
+        assert len(security) == 1
+        assert queue.dropped == 2
+    
+    async def test_file_sink_appends_json_lines(self, monkeypatch, tmp_path):
+        """Test that the file sink appends each batch as JSON lines."""
+        path = tmp_path / "audit.log"
+        sink = audit.AuditFileSink(str(path))
+        monkeypatch.setattr(audit, "audit_file_sink", sink)
+        
+        audit.write_audit_entries([{"action": "first"}, {"action": "second"}])
+        audit.write_audit_entries([{"action": "third"}])
+        sink.close()
+        
+        lines = path.read_bytes().splitlines()
+        assert [orjson.loads(line)["action"] for line in lines] == ["first", "second", "third"]
+    
+    def test_security_description_formatted_when_written(self, monkeypatch):
+        """Test that security event descriptions are filled in by the writer."""
+        logged = []
+        
+        class RecordingLogger:
+            def warning(self, event, **entry):
+                logged.append(entry)
+        
+        monkeypatch.setattr(audit, "security_logger", RecordingLogger())
+        audit.write_security_entries([{
+            "event_type": "login_failed",
+            "description": "Failed login attempt for: {email}",
+            "description_fields": {"email": "a@b.com"}
+        }])
+        
+        assert logged == [{"event_type": "login_failed", "description": "Failed login attempt for: a@b.com"}]
+    
+    async def test_middleware_skips_health_and_static_paths(self, monkeypatch):
+        """Test that only non-static requests produce an api_request entry."""
+        written = []
+        monkeypatch.setattr(audit, "write_audit_entries", lambda entries: written.extend(entries))
+        
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200})
+        
+        async def send(message):
+            pass
+        
+        middleware = audit.AuditMiddleware(app)
+        for path in ("/health", "/static/js/main.js", "/api/v1/intake"):
+            await middleware({"type": "http", "method": "GET", "path": path}, None, send)
+        
+        assert [entry["details"]["path"] for entry in written] == ["/api/v1/intake"]
+        assert "patient_id" not in written[0]
+        assert written[0]["details"]["duration_ms"] >= 0
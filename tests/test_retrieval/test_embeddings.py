@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.retrieval.embeddings import EmbeddingBatcher
+
+
+class TestEmbeddingBatcher:
+    """Test suite for embedding request coalescing."""
+    
+    @pytest.fixture
+    def calls(self):
+        """Batches passed to the fake embedder."""
+        return []
+    
+    @pytest.fixture
+    def embed_many(self, calls):
+        """Fake embedder returning [len(text)] for each text."""
+        async def embed_many(texts):
+            calls.append(list(texts))
+            await asyncio.sleep(0)
+            return [[float(len(text))] for text in texts]
+        return embed_many
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self, embed_many, calls):
+        """Test requests arriving together are embedded in a single call, in order."""
+        batcher = EmbeddingBatcher(embed_many, max_batch=32, max_wait=0.01)
+        
+        vectors = await asyncio.gather(*(batcher.embed("x" * n) for n in range(1, 6)))
+        
+        assert vectors == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+        assert len(calls) == 1
+    
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_without_waiting(self, embed_many, calls):
+        """Test max_batch splits the load and flushes immediately."""
+        batcher = EmbeddingBatcher(embed_many, max_batch=2, max_wait=60)
+        
+        vectors = await asyncio.wait_for(
+            asyncio.gather(*(batcher.embed("x" * n) for n in range(1, 5))),
+            timeout=1
+        )
+        
+        assert vectors == [[1.0], [2.0], [3.0], [4.0]]
+        assert [len(batch) for batch in calls] == [2, 2]
+    
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test a failed batch call raises in each waiting request."""
+        async def failing_embed_many(texts):
+            raise RuntimeError("embedding service down")
+        
+        batcher = EmbeddingBatcher(failing_embed_many, max_wait=0.001)
+        
+        results = await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+        
+        assert all(isinstance(result, RuntimeError) for result in results)
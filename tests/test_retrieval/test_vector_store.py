@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from app.models.guideline import Guideline
+from app.retrieval.vector_store import VectorStore
+
+
+class TestVectorStore:
+    """Test suite for guideline vector search."""
+    
+    @pytest.fixture
+    def guidelines(self):
+        """Guidelines with random embeddings."""
+        rng = np.random.default_rng(0)
+        return [
+            Guideline(
+                id=f"guideline_{i}",
+                content=f"Guideline {i}",
+                metadata={"specialty": "cardiology" if i % 2 else "endocrinology"},
+                embedding_vector=rng.standard_normal(32).tolist()
+            )
+            for i in range(200)
+        ]
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("index_type", ["flat", "hnsw", "sq8"])
+    async def test_search_finds_nearest_guideline(self, guidelines, index_type):
+        """Test the closest guideline ranks first for each index type."""
+        store = VectorStore(dimension=32, index_type=index_type)
+        await store.add_guidelines(guidelines)
+        
+        results = await store.search(guidelines[42].embedding_vector, k=5)
+        
+        assert results[0][0].id == "guideline_42"
+        assert results[0][1] == pytest.approx(1.0, abs=1e-2)
+        assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+    
+    @pytest.mark.asyncio
+    async def test_ivfpq_search_trains_and_probes(self, guidelines):
+        """Test the product-quantized index trains on first add and still recalls the query."""
+        store = VectorStore(dimension=32, index_type="ivfpq", ivf_nlist=4, ivf_nprobe=4, pq_m=8, pq_nbits=4)
+        await store.add_guidelines(guidelines)
+        
+        results = await store.search(guidelines[42].embedding_vector, k=5)
+        
+        assert store.index.is_trained
+        assert "guideline_42" in [guideline.id for guideline, _ in results]
+    
+    @pytest.mark.asyncio
+    async def test_hnsw_index_round_trips(self, guidelines, tmp_path):
+        """Test a saved HNSW index reloads with the same results."""
+        store = VectorStore(dimension=32, index_type="hnsw")
+        await store.add_guidelines(guidelines)
+        await store.save_index(str(tmp_path / "guidelines"))
+        
+        loaded = VectorStore(dimension=32, index_type="hnsw")
+        await loaded.load_index(str(tmp_path / "guidelines"))
+        
+        results = await loaded.search(guidelines[7].embedding_vector, k=3, filters={"specialty": "cardiology"})
+        
+        assert results[0][0].id == "guideline_7"
+        assert loaded.get_stats()["index_type"] == "hnsw"